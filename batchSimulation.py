@@ -0,0 +1,140 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+from smartCharging import CHARGINGTIME, TRIPTIME, NUM_VEHICLES, SIMULATION_TIME, MAX_QUEUE_LENGTH
+
+
+# 车辆状态编码
+RUNNING = 0
+IN_TRIP = 1
+TRAVELING_TO_STATION = 2
+WAITING = 3
+SWAPPING = 4
+
+# 参数矩阵的列顺序，与 simulate 的参数顺序一致
+PARAM_NAMES = ["high_battery_threshold", "low_battery_threshold", "swap_ready_threshold", "alpha", "dec"]
+
+
+def param_grid(high_battery_threshold, low_battery_threshold, swap_ready_threshold, alpha, dec):
+    """各参数取值的笛卡尔积，返回 (N, 5) 的参数矩阵"""
+    return np.array(list(itertools.product(high_battery_threshold, low_battery_threshold, swap_ready_threshold,
+                                           alpha, dec)), dtype=float)
+
+
+def needs_swap(charge, swap_queue_length, max_length, high, low, alpha, dec):
+    """Vehicle.needs_swap 的向量化版本，按场景逐元素判断"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        soc_factor = (high - charge) / (high - low)
+        queue_factor = 1 - (swap_queue_length / max_length)
+        score = alpha * soc_factor + (1 - alpha) * queue_factor
+    return (charge < high) & ((charge < low) | ((swap_queue_length <= max_length) & (score >= dec)))
+
+
+def simulate_batch(params, num_vehicles=None, simulation_time=None, num_batteries=10, charge_time=90):
+    """
+    同时仿真 N 组相互独立的参数，每组参数的结果与 simulate 完全一致。
+    params: (N, 5) 数组，列顺序见 PARAM_NAMES
+    返回每组参数的总运行时间，形状为 (N,)
+    """
+    num_vehicles = NUM_VEHICLES if num_vehicles is None else num_vehicles
+    simulation_time = SIMULATION_TIME if simulation_time is None else simulation_time
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    high, low, swap_ready, alpha, dec = params.T
+    n = params.shape[0]
+    max_length = MAX_QUEUE_LENGTH
+    charge_rate = 100 / charge_time
+    rows = np.arange(n)
+
+    # 车辆状态
+    state = np.full((n, num_vehicles), RUNNING, dtype=np.int8)
+    soc = np.full((n, num_vehicles), 100.0)
+    timer = np.zeros((n, num_vehicles), dtype=np.int64)  # 行程/前往换电站/换电的结束时间
+    ticket = np.full((n, num_vehicles), -1, dtype=np.int64)  # 进入换电队列的排队号
+    running_time = np.zeros(n, dtype=np.int64)
+
+    # 换电站状态，电池池的 order 记录电池在 available_batteries 列表中的先后顺序
+    pool = np.full((n, num_batteries), 100.0)
+    order = np.tile(np.arange(num_batteries, dtype=np.int64), (n, 1))
+    next_order = num_batteries
+    swap_queue_length = np.zeros(n, dtype=np.int64)
+    traveling_length = np.zeros(n, dtype=np.int64)
+    next_ticket = np.zeros(n, dtype=np.int64)
+    served = np.zeros(n, dtype=np.int64)  # 已完成换电的车辆数，即当前队首的排队号
+    last_swap_end_time = np.zeros(n, dtype=np.int64)
+
+    for time in range(simulation_time):
+        for v in range(num_vehicles):
+            s = state[:, v].copy()
+
+            running = s == RUNNING
+            if running.any():
+                state[running, v] = IN_TRIP
+                timer[running, v] = time + TRIPTIME
+
+            trip_end = (s == IN_TRIP) & (time >= timer[:, v])
+            if trip_end.any():
+                soc[trip_end, v] -= 10
+                running_time[trip_end] += TRIPTIME
+                swap = trip_end & needs_swap(soc[:, v], swap_queue_length + traveling_length, max_length,
+                                             high, low, alpha, dec)
+                state[trip_end, v] = RUNNING
+                state[swap, v] = TRAVELING_TO_STATION
+                timer[swap, v] = time + 10
+                traveling_length[swap] += 1
+
+            arrive = (s == TRAVELING_TO_STATION) & (time >= timer[:, v])
+            if arrive.any():
+                state[arrive, v] = WAITING
+                traveling_length[arrive] -= 1
+                swap_queue_length[arrive] += 1
+                ticket[arrive, v] = next_ticket[arrive]
+                next_ticket[arrive] += 1
+
+            head = (s == WAITING) & (ticket[:, v] == served) & (time >= last_swap_end_time)
+            if head.any():
+                eligible = pool >= swap_ready[:, None]
+                head &= eligible.any(axis=1)
+            if head.any():
+                # 选电量最多的电池，电量相同时取列表中靠前的一块
+                charge = np.where(eligible, pool, -np.inf)
+                best = eligible & (charge == charge.max(axis=1)[:, None])
+                idx = np.where(best, order, np.iinfo(np.int64).max).argmin(axis=1)
+                hr, hi = rows[head], idx[head]
+                new_charge = pool[hr, hi]
+                pool[hr, hi] = soc[hr, v]
+                order[hr, hi] = next_order
+                next_order += 1
+                soc[hr, v] = new_charge
+
+                last_swap_end_time[head] = time + CHARGINGTIME
+                served[head] += 1
+                swap_queue_length[head] -= 1
+                state[head, v] = SWAPPING
+                timer[head, v] = time + 10 + CHARGINGTIME  # 8min 换电 + 10min 前往起点
+
+            swap_end = (s == SWAPPING) & (time >= timer[:, v])
+            state[swap_end, v] = RUNNING
+
+        # 充电站电池充电
+        np.minimum(100, pool + charge_rate * 1, out=pool)
+
+    return running_time
+
+
+if __name__ == "__main__":
+    import time as _time
+
+    # 21×21 的 (alpha, dec) 网格一次完成
+    alphas = [i / 20 for i in range(21)]
+    decs = [j / 20 for j in range(21)]
+    grid = param_grid([90], [35], [100], alphas, decs)
+
+    start = _time.time()
+    res = simulate_batch(grid)
+    print(f"{len(grid)} 组参数用时：{_time.time() - start:.2f} 秒")
+
+    df = pd.DataFrame(res.reshape(len(alphas), len(decs)))
+    best = np.flatnonzero(res == res.max())
+    print("最大总运行时间：", res.max(), "分钟")
+    print("最优 (alpha, dec)：", [(float(grid[k, 3]), float(grid[k, 4])) for k in best])
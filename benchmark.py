@@ -0,0 +1,249 @@
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+
+from smartCharging import simulate, simulate_event_driven
+from simulationMetrics import TotalsOnlyMetrics
+
+POLICY = (90, 35, 100, 0.9, 0.6)  # high, low, swap_ready, alpha, dec
+
+# 各规模的取值，quick 用于快速检查
+SIM_CASES = {
+    "full": {
+        "num_vehicles": [7, 50, 200],
+        "simulation_time": [360, 1440, 4320],
+        "num_batteries": [10, 100],
+    },
+    "quick": {
+        "num_vehicles": [7, 50],
+        "simulation_time": [360, 1440],
+        "num_batteries": [10],
+    },
+}
+MODEL_CASES = {
+    "full": {"I": [3, 7], "J": [6, 13, 24], "H": [360, 720], "formulation": ["pairwise", "compact"],
+             "presolve": [False, True]},
+    "quick": {"I": [3], "J": [6, 13], "H": [360], "formulation": ["pairwise", "compact"], "presolve": [False, True]},
+}
+# 求解对比的算例，J 由预处理确定；exact 为不依赖 MIP 求解器的分支定界
+SOLVE_CASES = {
+    "full": {"I": [2, 3, 5], "H": [240, 360, 720], "formulation": ["pairwise", "compact"],
+             "backend": ["gurobi", "highs", "exact"]},
+    "quick": {"I": [2, 3], "H": [240], "formulation": ["compact"], "backend": ["gurobi", "highs", "exact"]},
+}
+
+
+class EventCounter:
+    """与 EventTrace 接口相同，只计数，用来统计仿真中的事件数"""
+    def __init__(self):
+        self.count = 0
+
+    def record(self, *args):
+        self.count += 1
+
+    def record_swap(self, *args):
+        self.count += 1
+
+
+def measure(fn, repeat=3):
+    """最短用时（秒）和单次运行的峰值内存（字节）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, res
+
+
+def bench_simulation(mode="full", repeat=3):
+    """按车辆数、仿真时长、电池数扫描两种仿真引擎"""
+    cases = SIM_CASES[mode]
+    rows = []
+    for num_vehicles in cases["num_vehicles"]:
+        for simulation_time in cases["simulation_time"]:
+            for num_batteries in cases["num_batteries"]:
+                counter = EventCounter()
+                simulate_event_driven(*POLICY, num_vehicles, simulation_time, num_batteries, trace=counter)
+                for name, simulate_fn in [("tick", simulate), ("event", simulate_event_driven)]:
+                    wall, peak, res = measure(lambda: simulate_fn(*POLICY, num_vehicles, simulation_time, num_batteries,
+                                                                  metrics=TotalsOnlyMetrics()), repeat)
+                    rows.append({
+                        "benchmark": f"simulate_{name}",
+                        "num_vehicles": num_vehicles,
+                        "simulation_time": simulation_time,
+                        "num_batteries": num_batteries,
+                        "wall_time": wall,
+                        "peak_memory": peak,
+                        "events": counter.count,
+                        "events_per_second": counter.count / wall,
+                        "total_runtime": res[0],
+                    })
+                    print(rows[-1])
+    return rows
+
+
+def bench_model(mode="full", repeat=1):
+    """
+    按车辆数、任务数、时窗、模型形式和是否预处理扫描模型构建（只计建模时间，不求解，不需要许可证）：
+    build_milp 为构建稀疏矩阵形式，安装了 gurobipy 时再计 to_gurobi 导出成 Gurobi 模型的时间。
+    """
+    from milpModel import build_milp, to_gurobi
+    try:
+        import gurobipy  # noqa: F401
+        has_gurobi = True
+    except ImportError:
+        has_gurobi = False
+        print("未安装 gurobipy，只计稀疏矩阵的构建")
+
+    cases = MODEL_CASES[mode]
+    rows = []
+    for I in cases["I"]:
+        for H in cases["H"]:
+            for formulation in cases["formulation"]:
+                for presolve in cases["presolve"]:
+                    # 预处理时 J 由 presolve 确定，传入的 J 不起作用，只构建一次并记录实际的 J
+                    for J in (cases["J"][:1] if presolve else cases["J"]):
+                        wall, peak, form = measure(lambda: build_milp({"I": I, "J": J, "H": H}, formulation, presolve),
+                                                   repeat)
+                        case = {"I": I, "J": form["blocks"]["T"][1][1], "H": H, "formulation": formulation,
+                                "presolve": presolve}
+                        num_constrs, num_vars = form["A"].shape
+                        rows.append({"benchmark": "build_milp", **case, "wall_time": wall, "peak_memory": peak,
+                                     "num_vars": num_vars, "num_constrs": num_constrs,
+                                     "vars_per_second": num_vars / wall})
+                        print(rows[-1])
+                        if not has_gurobi:
+                            continue
+
+                        def export():
+                            model, _ = to_gurobi(form)
+                            model.update()
+                            return model
+                        wall, peak, model = measure(export, repeat)
+                        rows.append({"benchmark": "to_gurobi", **case, "wall_time": wall, "peak_memory": peak,
+                                     "num_vars": model.NumVars, "num_constrs": model.NumConstrs,
+                                     "vars_per_second": model.NumVars / wall})
+                        print(rows[-1])
+                        model.dispose()
+    return rows
+
+
+def solve_with(backend, params, formulation, time_limit):
+    """用指定后端求解一个算例，返回求解信息（status/objective/bound/runtime）"""
+    if backend == "exact":
+        from exactSolver import solve_exact
+        return solve_exact(params, time_limit=time_limit)[1]
+    if backend == "highs":
+        from milpModel import build_milp, solve_highs
+        return solve_highs(build_milp(params, formulation, presolve_model=True), time_limit)[1]
+    from gurobipy import GRB
+    from gurobiModel import build_model
+    from resultStore import solve_info
+    model, _ = build_model(params, formulation, presolve_model=True)
+    model.setParam("OutputFlag", 0)
+    model.setParam("TimeLimit", time_limit)
+    model.optimize()
+    # 状态码换成与其他后端相同的写法
+    status = {GRB.OPTIMAL: "optimal", GRB.TIME_LIMIT: "time_limit", GRB.INFEASIBLE: "infeasible"}
+    info = {**solve_info(model), "status": status.get(model.Status, str(model.Status))}
+    model.dispose()
+    return info
+
+
+def bench_solve(mode="full", time_limit=300):
+    """
+    同一批算例分别用 Gurobi、HiGHS（scipy.optimize.milp）和分支定界求解，比较用时和目标值。
+    未安装或许可证不支持的后端跳过；match 表示目标值与同一算例中已证明最优的结果一致。
+    """
+    cases = SOLVE_CASES[mode]
+    rows = []
+    for I in cases["I"]:
+        for H in cases["H"]:
+            params = {"I": I, "H": H}
+            case_rows = []
+            for backend in cases["backend"]:
+                for formulation in (cases["formulation"] if backend != "exact" else [None]):
+                    start = time.perf_counter()
+                    try:
+                        info = solve_with(backend, params, formulation, time_limit)
+                    except ImportError:
+                        print(f"未安装 {backend} 后端，跳过")
+                        continue
+                    except Exception as e:
+                        # 例如 Gurobi 受限许可证无法求解较大的模型
+                        print(f"{backend} 求解 I={I}, H={H} 失败：{e}")
+                        continue
+                    row = {
+                        "benchmark": f"solve_{backend}",
+                        "I": I,
+                        "H": H,
+                        "wall_time": time.perf_counter() - start,
+                        "status": info["status"],
+                        "objective": info["objective"],
+                        "bound": info["bound"],
+                    }
+                    if formulation is not None:
+                        row["formulation"] = formulation
+                    case_rows.append(row)
+            optimal = {row["objective"] for row in case_rows if row["status"] == "optimal"}
+            for row in case_rows:
+                row["match"] = None if len(optimal) != 1 else row["objective"] in optimal
+                print(row)
+            rows += case_rows
+    return rows
+
+
+def case_key(row):
+    return tuple(sorted((k, v) for k, v in row.items() if k in
+                        ("benchmark", "num_vehicles", "simulation_time", "num_batteries", "I", "J", "H",
+                         "formulation", "presolve")))
+
+
+def compare(baseline, current):
+    """逐项比较用时，ratio > 1 表示比基线慢"""
+    base = {case_key(row): row for row in baseline["results"]}
+    for row in current["results"]:
+        old = base.get(case_key(row))
+        if old is None:
+            continue
+        ratio = row["wall_time"] / old["wall_time"]
+        label = ", ".join(f"{k}={v}" for k, v in case_key(row))
+        flag = "  <-- 变慢" if ratio > 1.2 else ""
+        print(f"{label}: {old['wall_time']:.4f}s -> {row['wall_time']:.4f}s ({ratio:.2f}x){flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="仿真与模型构建的性能基准")
+    parser.add_argument("--quick", action="store_true", help="只跑小规模算例")
+    parser.add_argument("--skip-model", action="store_true", help="不跑模型构建基准")
+    parser.add_argument("--skip-solve", action="store_true", help="不跑求解后端对比")
+    parser.add_argument("--time-limit", type=float, default=300, help="求解对比中每次求解的时间上限（秒）")
+    parser.add_argument("--save", help="把结果保存为 JSON 基线")
+    parser.add_argument("--compare", help="与已保存的 JSON 基线比较")
+    args = parser.parse_args()
+
+    mode = "quick" if args.quick else "full"
+    results = bench_simulation(mode)
+    if not args.skip_model:
+        results += bench_model(mode)
+    if not args.skip_solve:
+        results += bench_solve(mode, args.time_limit)
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "mode": mode,
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
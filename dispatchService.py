@@ -0,0 +1,229 @@
+import argparse
+import heapq
+import json
+import socketserver
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from eventTrace import STATE_CHANGE, STATE_CODES, SWAP, EventTrace, load_trace
+from smartCharging import CHARGINGTIME, MAX_QUEUE_LENGTH, Battery, BatterySwapStation, Vehicle, simulate_event_driven
+
+POLICY = (90, 35, 100, 0.9, 0.6)  # high, low, swap_ready, alpha, dec
+
+
+class SwapDispatcher:
+    """
+    在线换电决策：每收到一个行程结束事件（时间、车辆、电量），用 Vehicle.needs_swap 判断是否换电，
+    并增量维护换电站状态：前往和排队换电的车辆、换电位空闲时间和电池池。
+    决定换电的车辆立即按 simulate_event_driven 的规则预约换电：到站后下一分钟起、换电位空闲、
+    有电池达到 swap_ready 时开始，换上电量最多的电池，由此给出预计等待时间。
+    事件须按时间先后送入；每个事件只做少量堆操作，不需要重新仿真。
+    """
+    def __init__(self, policy=POLICY, num_batteries=10, charge_time=90, swap_time=CHARGINGTIME, travel_time=10,
+                 max_length=MAX_QUEUE_LENGTH):
+        self.high, self.low, self.swap_ready, self.alpha, self.dec = policy
+        self.swap_time = swap_time
+        self.travel_time = travel_time
+        self.max_length = max_length
+        self.station = BatterySwapStation(num_batteries, charge_time)
+        self.vehicles = {}
+        self.pending = []  # 已决定换电、尚未开始换电的车辆的 (换电开始时间, 车辆编号)（小顶堆）
+        self.time = 0
+
+    def vehicle(self, vehicle_id):
+        if vehicle_id not in self.vehicles:
+            self.vehicles[vehicle_id] = Vehicle(vehicle_id, Battery(), self.high, self.low, self.alpha, self.dec)
+        return self.vehicles[vehicle_id]
+
+    def queue_length(self, now, vehicle_id):
+        """
+        车辆 vehicle_id 在 now 时刻结束行程时前往和排队换电的车辆数，与 BatterySwapStation.queue_length 对应。
+        仿真中事件按 (时间, 车辆编号) 处理，同一分钟开始的换电只有车辆编号更小时才先于这次行程结束，不再计入。
+        """
+        while self.pending and self.pending[0][0] < now:
+            heapq.heappop(self.pending)
+        return sum(1 for start, other in self.pending if (start, other) > (now, vehicle_id))
+
+    def trip_end(self, now, vehicle_id, soc):
+        """
+        处理一个行程结束事件，soc 为行程结束后的电量。
+        返回决策字典：swap、决策时的排队车辆数 queue_length，换电时还有预计开始时间 swap_start 和
+        到站后的预计等待时间 wait（没有电池能达到 swap_ready 时二者为 None）。
+        """
+        if now < self.time:
+            raise ValueError(f"事件时间 {now} 早于上一个事件的时间 {self.time}")
+        self.time = now
+        vehicle = self.vehicle(vehicle_id)
+        vehicle.battery = Battery()
+        vehicle.battery.charge = soc
+        queue_length = self.queue_length(now, vehicle_id)
+        decision = {"vehicle": vehicle_id, "time": now, "swap": bool(vehicle.needs_swap(queue_length, self.max_length)),
+                    "queue_length": queue_length}
+        if decision["swap"]:
+            decision["swap_start"], decision["wait"] = self.reserve(vehicle, now + self.travel_time)
+        return decision
+
+    def reserve(self, vehicle, arrival):
+        """预约换电：换电按决策先后进行，电池池的时钟只会前进到已预约的换电开始时间"""
+        station = self.station
+        station.charge_batteries(max(arrival + 1, station.last_swap_end_time) - station.time)
+        ready_time = station.ready_time(self.swap_ready)
+        if ready_time is None:
+            return None, None
+        start = max(arrival + 1, station.last_swap_end_time, ready_time)
+        station.charge_batteries(start - station.time)
+        station.swap_battery(vehicle, self.swap_ready, start, self.swap_time)
+        heapq.heappush(self.pending, (start, vehicle.id))
+        return start, start - arrival
+
+    def handle(self, request):
+        """处理一个请求：单个事件 {"time", "vehicle", "soc"} 或事件列表（批量），按顺序给出决策"""
+        if isinstance(request, list):
+            return [self.trip_end(event["time"], event["vehicle"], event["soc"]) for event in request]
+        return self.trip_end(request["time"], request["vehicle"], request["soc"])
+
+
+class DispatchHandler(socketserver.StreamRequestHandler):
+    """每行一个 JSON 请求，回复一行 JSON"""
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                with self.server.lock:
+                    response = self.server.dispatcher.handle(request)
+            except (ValueError, KeyError, TypeError) as e:
+                response = {"error": str(e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+            self.wfile.flush()
+
+
+def serve(dispatcher, host="127.0.0.1", port=8765):
+    """在本机启动决策服务，多个连接共享同一个换电站状态"""
+    server = socketserver.ThreadingTCPServer((host, port), DispatchHandler)
+    server.daemon_threads = True
+    server.dispatcher = dispatcher
+    server.lock = threading.Lock()
+    return server
+
+
+def trip_ends(trace):
+    """仿真记录中的行程结束事件（时间、车辆、电量）以及仿真中实际是否去换电"""
+    records = np.asarray(trace)
+    records = records[(records["kind"] == STATE_CHANGE) & (records["old_state"] == STATE_CODES["in_trip"])]
+    return pd.DataFrame({
+        "time": records["time"].astype(np.int64),
+        "vehicle": records["vehicle"].astype(np.int64),
+        "soc": records["soc"].astype(float),
+        "actual_swap": records["new_state"] == STATE_CODES["traveling_to_station"],
+    })
+
+
+def replay(trace, dispatcher, batch_size=1):
+    """
+    把记录的事件流按 batch_size 一批送入决策服务，用于压力测试。
+    返回每个事件的决策（与仿真中实际决策并列）和用时统计（每批的用时，单位微秒）。
+    """
+    events = trip_ends(trace)
+    requests = [{"time": int(t), "vehicle": int(v), "soc": float(soc)}
+                for t, v, soc in zip(events["time"], events["vehicle"], events["soc"])]
+    decisions, latencies = [], []
+    for k in range(0, len(requests), batch_size):
+        start = time.perf_counter_ns()
+        decisions += dispatcher.handle(requests[k:k + batch_size])
+        latencies.append((time.perf_counter_ns() - start) / 1000)
+    df = pd.concat([events, pd.DataFrame(decisions).drop(columns=["time", "vehicle"])], axis=1)
+    latencies = np.array(latencies)
+    stats = {
+        "events": len(requests),
+        "batches": len(latencies),
+        "mean_us": float(latencies.mean()) if len(latencies) else None,
+        "p50_us": float(np.percentile(latencies, 50)) if len(latencies) else None,
+        "p99_us": float(np.percentile(latencies, 99)) if len(latencies) else None,
+        "per_event_us": float(latencies.sum() / max(len(requests), 1)),
+        "agreement": float((df["swap"] == df["actual_swap"]).mean()) if len(df) else None,
+    }
+    return df, stats
+
+
+def check_replay(policy=POLICY, num_vehicles=50, simulation_time=1440, num_batteries=10):
+    """
+    用 simulate_event_driven 仿真并把行程结束事件逐个送入决策服务，逐事件与仿真对比：
+    是否换电、决策时的排队车辆数和换电开始时间（仿真结束前没有开始的换电记为缺失）。
+    返回不一致的事件（完全一致时为空表）。
+    """
+    recorder = EventTrace()
+    simulate_event_driven(*policy, num_vehicles, simulation_time, num_batteries, trace=recorder)
+    trace = recorder.to_array()
+    df, _ = replay(trace, SwapDispatcher(policy, num_batteries))
+
+    # 仿真中的排队车辆数：记录按处理顺序写入，累计进入和离开前往、排队换电状态的车辆数
+    changes = trace[trace["kind"] == STATE_CHANGE]
+    queued = [STATE_CODES["traveling_to_station"], STATE_CODES["waiting"]]
+    delta = np.isin(changes["new_state"], queued).astype(np.int64) - np.isin(changes["old_state"], queued)
+    before = np.cumsum(delta) - delta
+    df["actual_queue"] = before[changes["old_state"] == STATE_CODES["in_trip"]]
+
+    # 每辆车的第 k 次换电对应该车的第 k 次换电决策
+    swaps = trace[trace["kind"] == SWAP]
+    actual = pd.DataFrame({"vehicle": swaps["vehicle"].astype(np.int64), "actual_start": swaps["time"].astype(np.int64)})
+    actual["k"] = actual.groupby("vehicle").cumcount()
+    planned = df.loc[df["swap"], ["vehicle"]]
+    planned["k"] = planned.groupby("vehicle").cumcount()
+    planned = planned.reset_index().merge(actual, on=["vehicle", "k"], how="left").set_index("index")
+    df["actual_start"] = planned["actual_start"]
+    start = pd.to_numeric(df["swap_start"]) if "swap_start" in df else pd.Series(np.nan, index=df.index)
+    start = start.where(start < simulation_time)
+    same_start = (start == df["actual_start"]) | (start.isna() & df["actual_start"].isna())
+
+    mismatch = (df["swap"] != df["actual_swap"]) | (df["queue_length"] != df["actual_queue"]) | ~same_start
+    return df[mismatch]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="在线换电决策服务")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="启动本机决策服务（每行一个 JSON 请求）")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    replay_parser = subparsers.add_parser("replay", help="回放事件流做压力测试")
+    replay_parser.add_argument("trace", nargs="?", help="eventTrace 记录文件，不给出时用默认策略仿真生成")
+    replay_parser.add_argument("--batch-size", type=int, default=1)
+    replay_parser.add_argument("--num-vehicles", type=int, default=50)
+    replay_parser.add_argument("--simulation-time", type=int, default=1440)
+    check_parser = subparsers.add_parser("check", help="随机抽取策略，逐事件与 simulate_event_driven 对比")
+    check_parser.add_argument("--samples", type=int, default=30)
+    check_parser.add_argument("--num-vehicles", type=int, default=50)
+    check_parser.add_argument("--simulation-time", type=int, default=1440)
+    check_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        with serve(SwapDispatcher(), args.host, args.port) as server:
+            print(f"决策服务运行在 {args.host}:{args.port}")
+            server.serve_forever()
+    elif args.command == "check":
+        rng = np.random.default_rng(args.seed)
+        num_failed = 0
+        for _ in range(args.samples):
+            low = int(rng.integers(10, 61))
+            policy = (int(rng.integers(low + 1, 101)), low, int(rng.integers(50, 101)),
+                      round(float(rng.random()), 2), round(float(rng.random()), 2))
+            mismatch = check_replay(policy, args.num_vehicles, args.simulation_time)
+            num_failed += len(mismatch) > 0
+            print(policy, "一致" if mismatch.empty else f"{len(mismatch)} 个事件不一致")
+        print(f"{args.samples} 组策略中 {num_failed} 组不一致")
+        raise SystemExit(int(num_failed > 0))
+    else:
+        if args.trace is None:
+            recorder = EventTrace()
+            simulate_event_driven(*POLICY, args.num_vehicles, args.simulation_time, trace=recorder)
+            trace = recorder.to_array()
+        else:
+            trace = load_trace(args.trace)
+        _, stats = replay(trace, SwapDispatcher(), args.batch_size)
+        print(stats)
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+
+# 车辆状态编码，与 batchSimulation 中的状态编码一致
+STATES = ["running", "in_trip", "traveling_to_station", "waiting", "swapping"]
+STATE_CODES = {state: code for code, state in enumerate(STATES)}
+
+# 记录类型
+STATE_CHANGE = 0
+SWAP = 1
+
+TRACE_DTYPE = np.dtype([
+    ("time", "<i4"),
+    ("kind", "u1"),  # STATE_CHANGE 或 SWAP
+    ("vehicle", "<i4"),
+    ("old_state", "i1"),
+    ("new_state", "i1"),
+    ("soc", "<f4"),  # 事件之后车辆的电量
+    ("queue_length", "<i4"),  # 事件之后的换电排队长度
+    ("battery_soc", "<f4"),  # 换电记录：换下电池的电量；状态记录为 nan
+])
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _npy_header(count):
+    """.npy 文件头，按 20 位数字预留长度，写完数据后可以原地改写记录数"""
+    header = {"descr": np.lib.format.dtype_to_descr(TRACE_DTYPE), "fortran_order": False, "shape": (count,)}
+    max_len = len(repr({**header, "shape": (10 ** 20,)})) + 1
+    total = -(-(len(_NPY_MAGIC) + 2 + max_len) // 64) * 64
+    text = repr(header).ljust(total - len(_NPY_MAGIC) - 2 - 1) + "\n"
+    return _NPY_MAGIC + len(text).to_bytes(2, "little") + text.encode("latin1")
+
+
+class EventTrace:
+    """
+    车辆状态变化和换电的紧凑记录，存放在预分配的结构化数组中。
+    给出 path 时缓冲区满了就追加写入 .npy 文件，close 之后可以用 load_trace 以内存映射方式读取；
+    不给 path 时缓冲区按需扩容，用 to_array 取出结果。
+    """
+    def __init__(self, path=None, buffer_size=65536):
+        self.path = path
+        self.buffer = np.empty(buffer_size, dtype=TRACE_DTYPE)
+        self.n = 0  # 缓冲区中的记录数
+        self.num_written = 0  # 已写入文件的记录数
+        self.file = None
+        if path is not None:
+            self.file = open(path, "wb")
+            self.file.write(_npy_header(0))
+
+    def record(self, time, vehicle_id, old_state, new_state, soc, queue_length):
+        """记录一次状态变化"""
+        if self.n == len(self.buffer):
+            self.flush()
+        self.buffer[self.n] = (time, STATE_CHANGE, vehicle_id, STATE_CODES[old_state], STATE_CODES[new_state],
+                               soc, queue_length, np.nan)
+        self.n += 1
+
+    def record_swap(self, time, vehicle_id, soc, battery_soc, queue_length):
+        """记录一次换电，soc 为换上电池的电量，battery_soc 为换下电池的电量"""
+        if self.n == len(self.buffer):
+            self.flush()
+        code = STATE_CODES["waiting"]
+        self.buffer[self.n] = (time, SWAP, vehicle_id, code, code, soc, queue_length, battery_soc)
+        self.n += 1
+
+    def flush(self):
+        if self.file is None:
+            # 只在内存中记录时扩容
+            self.buffer = np.concatenate([self.buffer, np.empty(len(self.buffer), dtype=TRACE_DTYPE)])
+            return
+        self.file.write(self.buffer[:self.n].tobytes())
+        self.num_written += self.n
+        self.n = 0
+
+    def close(self):
+        """写出剩余记录并更新文件头中的记录数"""
+        if self.file is None:
+            return
+        self.flush()
+        self.file.seek(0)
+        self.file.write(_npy_header(self.num_written))
+        self.file.close()
+        self.file = None
+
+    def to_array(self):
+        if self.path is not None:
+            self.close()
+            return load_trace(self.path)
+        return self.buffer[:self.n]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_trace(path, mmap=True):
+    """读取记录文件，默认以内存映射方式打开"""
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def trace_to_frame(trace):
+    """转换成便于分析的 DataFrame，状态解码为名称"""
+    df = pd.DataFrame({name: np.asarray(trace[name]) for name in TRACE_DTYPE.names})
+    df["kind"] = np.where(df["kind"] == SWAP, "swap", "state")
+    df["old_state"] = np.array(STATES)[df["old_state"]]
+    df["new_state"] = np.array(STATES)[df["new_state"]]
+    return df
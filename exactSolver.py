@@ -0,0 +1,156 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from modelParams import DEFAULT_PARAMS, initial_state, presolve
+from warmStart import fill_unexecuted, heuristic_schedule
+
+
+def solve_exact(params=None, policy=(90, 35, 100, 0.9, 0.6), node_limit=None, time_limit=None):
+    """
+    不依赖 MIP 求解器的分支定界，结果与 build_model(params, presolve_model=True) 的最优解相同。
+
+    车辆每完成一个任务做一次决策：继续下一趟、去换电或停运。按决策时间先后处理，
+    换电站按到达顺序先到先换且不插入空闲：所有换电时长相同、换电后车辆状态相同，
+    交换两辆车换电之后的计划即可把任一最优解调整成这种形式。
+    - 上界：每辆车不计排队时最多还能完成的任务数之和；
+    - 剪枝：车辆状态（完成时间、电量）的集合和换电站空闲时间相同的节点，只保留已完成任务数最多的。
+    初始可行解取启发式策略（policy 同 simulate 的参数）的计划。
+    返回与 MIP 相同格式的结果字典（T/s/x/E/z 数组）和求解信息（status 为 optimal 或到达的限制）
+    """
+    start_time = time.perf_counter()
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    I, H, T_run, T_swap, T_trip = p["I"], p["H"], p["T_run"], p["T_swap"], p["T_trip"]
+    C_swap, Delta, C_min = p["C_swap"], p["Delta"], p["C_min"]
+    cycle = T_swap + T_trip + T_run
+    full = C_swap - Delta
+    p["J"], _, _, relax_energy = presolve(p)
+
+    @lru_cache(maxsize=None)
+    def remaining(t, e):
+        """不计排队时从 (完成时间, 电量) 出发最多还能完成的任务数，只在必须换电时换电"""
+        n = 0
+        while e >= C_min and t + T_run <= H:
+            n += 1
+            if e - Delta < C_min and full >= C_min:
+                t, e = t + cycle, full
+            else:
+                t, e = t + T_run, e - Delta
+        return n
+
+    def make_node(state, bay_free, tasks, parent, decision):
+        # 不能再执行任务的车辆记为 None
+        state = tuple(v if v is not None and remaining(*v) > 0 else None for v in state)
+        active = [v for v in state if v is not None]
+        bound = tasks + sum(remaining(*v) for v in active)
+        # 换电站早于最早的决策时间空闲等价于在该时间空闲
+        bay_free = max(bay_free, min(v[0] for v in active)) if active else 0
+        return state, bay_free, tasks, bound, parent, decision
+
+    # 初始可行解：启发式策略
+    high, low, _, alpha, dec = policy
+    heuristic = heuristic_schedule(high, low, alpha, dec, p, park=not relax_energy)
+    best_tasks = int(heuristic["z"].sum())
+    best_node = None
+
+    T_first, E_first = initial_state(p)
+    root = make_node(tuple((int(t), int(e)) for t, e in zip(T_first, E_first)), p["bay_free"], I, None, None)
+    stack = [root]
+    seen = {}
+    num_nodes = 0
+    status = "optimal"
+    while stack:
+        if node_limit is not None and num_nodes >= node_limit:
+            status = "node_limit"
+            break
+        if time_limit is not None and num_nodes % 1000 == 0 and time.perf_counter() - start_time > time_limit:
+            status = "time_limit"
+            break
+        node = stack.pop()
+        state, bay_free, tasks, bound, _, _ = node
+        if bound <= best_tasks:
+            continue
+        num_nodes += 1
+        active = [i for i, v in enumerate(state) if v is not None]
+        if not active:
+            best_tasks, best_node = tasks, node
+            continue
+
+        # 最早做决策的车辆：仍在 state 中的车辆电量不低于 C_min 且下一趟能在时窗内完成。
+        # 继续下一趟不占用换电站，所以能继续时停运不会比继续更好；不能继续（电量会降到 0 以下）时才考虑停运
+        i = min(active, key=lambda k: state[k][0])
+        t, e = state[i]
+        s = max(t, bay_free)
+        children = []
+        if e - Delta < 0:
+            children.append(make_node(state[:i] + (None,) + state[i + 1:], bay_free, tasks, node, None))
+        if s + cycle <= H:
+            children.append(make_node(state[:i] + ((s + cycle, full),) + state[i + 1:], s + T_swap, tasks + 1,
+                                      node, (i, s)))
+        if e - Delta >= 0:
+            children.append(make_node(state[:i] + ((t + T_run, e - Delta),) + state[i + 1:], bay_free, tasks + 1,
+                                      node, (i, None)))
+
+        # 后压入的先搜索：继续、换电、停运
+        for child in children:
+            child_state, child_bay_free, child_tasks, child_bound = child[:4]
+            if child_bound <= best_tasks:
+                continue
+            key = (tuple(sorted(v for v in child_state if v is not None)), child_bay_free)
+            if seen.get(key, -1) >= child_tasks:
+                continue
+            seen[key] = child_tasks
+            stack.append(child)
+
+    upper = best_tasks
+    if status != "optimal":
+        upper = max([best_tasks] + [node[3] for node in stack])
+    results = heuristic if best_node is None else schedule_from_node(best_node, p, park=not relax_energy)
+    info = {
+        "status": status,
+        "objective": T_run * best_tasks,
+        "bound": T_run * upper,
+        "gap": (upper - best_tasks) / best_tasks,
+        "runtime": time.perf_counter() - start_time,
+        "nodes": num_nodes,
+    }
+    return {name: results[name] for name in ("T", "s", "x", "E", "z")}, info
+
+
+def schedule_from_node(node, params, park=False):
+    """沿父节点回溯决策，整理成 (I, J) 的 T/s/x/E/z，未执行的槽由 fill_unexecuted 补齐"""
+    p = params
+    I, J, T_run, Delta = p["I"], p["J"], p["T_run"], p["Delta"]
+    decisions = []
+    while node[4] is not None:
+        if node[5] is not None:
+            decisions.append(node[5])
+        node = node[4]
+
+    T_first, E_first = initial_state(p)
+    T = np.zeros((I, J), dtype=np.int64)
+    s = np.zeros((I, J), dtype=np.int64)
+    x = np.zeros((I, J), dtype=np.int64)
+    E = np.zeros((I, J), dtype=np.int64)
+    z = np.zeros((I, J), dtype=np.int64)
+    T[:, 0], E[:, 0], z[:, 0] = T_first, E_first, 1
+    last = np.zeros(I, dtype=np.int64)
+    bay_free = p["bay_free"]
+    for i, swap_start in reversed(decisions):
+        j = last[i]
+        if swap_start is not None:
+            x[i, j], s[i, j] = 1, swap_start
+            bay_free = swap_start + p["T_swap"]
+            T[i, j + 1], E[i, j + 1] = swap_start + p["T_swap"] + p["T_trip"] + T_run, p["C_swap"] - Delta
+        else:
+            T[i, j + 1], E[i, j + 1] = T[i, j] + T_run, E[i, j] - Delta
+        z[i, j + 1] = 1
+        last[i] = j + 1
+    fill_unexecuted(T, s, x, E, last, bay_free, p, park)
+    return {"T": T, "s": s, "x": x, "E": E, "z": z}
+
+
+if __name__ == "__main__":
+    results, info = solve_exact({"I": 3, "H": 720}, time_limit=600)
+    print(info)
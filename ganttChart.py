@@ -0,0 +1,89 @@
+import argparse
+
+import numpy as np
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
+
+from eventTrace import STATES
+from resultStore import load_results
+from timeline import IN_TRIP, RUNNING, SWAPPING, TRAVELING, WAITING, timeline_from_results
+
+# 状态编码见 timeline，MIP 结果和仿真记录的状态矩阵都可以直接画
+EVENT_COLORS = {RUNNING: "lightgrey", IN_TRIP: "grey", WAITING: "blue", SWAPPING: "green", TRAVELING: "yellow"}
+
+
+def run_lengths(states):
+    """
+    按行对状态矩阵做游程编码，返回 (vehicle, start, length, state) 四个等长数组，
+    每个元素是一段连续相同状态的区间。
+    """
+    states = np.asarray(states)
+    I, H = states.shape
+    change = np.ones((I, H), dtype=bool)
+    change[:, 1:] = states[:, 1:] != states[:, :-1]
+    vehicle, start = np.nonzero(change)
+    # 每行开头都是新区间，所以展平后下一段的起点就是本段的终点
+    flat = vehicle * H + start
+    length = np.append(flat[1:], I * H) - flat
+    return vehicle, start, length, states[vehicle, start]
+
+
+def plot_gantt(states, ax, colors=None, gap=0.2, title="Gantt Chart of Events"):
+    """
+    在 ax 上画甘特图：每种状态的全部区间合成一个 PolyCollection，每行的上下边框合成一个 LineCollection，
+    图元数量与车辆数和时长无关。
+    """
+    colors = colors or EVENT_COLORS
+    states = np.asarray(states)
+    I, H = states.shape
+    vehicle, start, length, state = run_lengths(states)
+    for value, color in colors.items():
+        selected = state == value
+        if not selected.any():
+            continue
+        x0 = start[selected]
+        x1 = x0 + length[selected]
+        y0 = vehicle[selected] + gap / 2
+        y1 = y0 + 1 - gap
+        verts = np.stack([np.stack(corner, axis=-1) for corner in ((x0, y0), (x0, y1), (x1, y1), (x1, y0))], axis=1)
+        ax.add_collection(PolyCollection(verts, facecolors=color, edgecolors="none", linewidths=0,
+                                         label=STATES[value]))
+
+    # 上下边框
+    y = np.concatenate([np.arange(I) + gap / 2, np.arange(I) + 1 - gap / 2])
+    segments = np.stack([np.stack([np.zeros_like(y), y], axis=-1), np.stack([np.full_like(y, H), y], axis=-1)], axis=1)
+    ax.add_collection(LineCollection(segments, colors="black", linewidths=1))
+
+    ax.set_xlim(0, H)
+    ax.set_ylim(0, I)
+    ax.set_xlabel("Time")
+    ax.set_ylabel("Vehicles")
+    # 车辆多时只标部分刻度
+    step = max(1, I // 25)
+    ax.set_yticks(np.arange(0, I, step) + 0.5)
+    ax.set_yticklabels(np.arange(1, I + 1, step))
+    ax.set_title(title)
+    ax.legend(loc="upper right", fontsize="small")
+    return ax
+
+
+def save_gantt(states, path, width=14, row_height=0.3, dpi=150, **kwargs):
+    """不经过 pyplot 直接画到 Figure 并保存（格式由扩展名决定），无显示环境时也能用"""
+    I = len(states)
+    fig = Figure(figsize=(width, max(3.0, row_height * I + 1.5)))
+    plot_gantt(states, fig.add_subplot(), **kwargs)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="把结果文件画成甘特图并保存")
+    parser.add_argument("results", help="resultStore 保存的 .npz 结果文件")
+    parser.add_argument("output", help="输出图片路径，如 gantt.png / gantt.svg / gantt.pdf")
+    parser.add_argument("--dpi", type=int, default=150)
+    args = parser.parse_args()
+
+    results, meta = load_results(args.results)
+    save_gantt(timeline_from_results(results, meta["params"])["state"], args.output, dpi=args.dpi)
+    print(f"已保存 {args.output}")
@@ -1,8 +1,11 @@
-import pickle
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import numpy as np
 import pandas as pd
 
+from ganttChart import plot_gantt
+from resultStore import load_results
+from timeline import paint, timeline_from_results
+
 
 I = 7  # 车辆数
 J = 13  # 最大任务次数（根据实际情况调整）
@@ -11,23 +14,22 @@ SWAP_T = 8
 TRAVEL_AFTER_SWAP_T = 20
 
 
-with open(f"results_I_{I}_J_{J}_H_{H}.pkl", "rb") as f:
-    results = pickle.load(f)
+results, meta = load_results(f"results_I_{I}_J_{J}_H_{H}.npz")
+
+# 逐分钟的状态、电量和排队车辆数（与仿真记录的时间线格式相同，见 timeline）
+timeline = timeline_from_results(results, {**meta["params"], "T_swap": SWAP_T, "T_trip": TRAVEL_AFTER_SWAP_T})
 
 # part 1: soc level by time
-soc_level = []
-for i in range(I):
-    veh_soc = [0 for _ in range(H)]
-    for j in range(J):
-        if results['z'][i][j] > 0.5:
-            end_t = int(results['T'][i][j])
-            veh_soc[end_t - 30:end_t] = [int(results['E'][i][j])] * 30
-            if results['x'][i][j] > 0.5:
-                veh_soc[end_t:int(results['s'][i][j]+SWAP_T)] = (
-                        [results['E'][i][j]] * (int(results['s'][i][j]+SWAP_T) - end_t))
-                veh_soc[int(results['s'][i][j]+SWAP_T):int(results['s'][i][j]+SWAP_T+TRAVEL_AFTER_SWAP_T)] = (
-                        [100] * (int(results['s'][i][j]+SWAP_T+TRAVEL_AFTER_SWAP_T) - int(results['s'][i][j]+SWAP_T)))
-    soc_level.append(veh_soc)
+# 任务期间和随后的排队换电取任务结束后的电量 E[j]，换电后返回途中为 100，其余为 0
+# （与 timeline["soc"] 不同：后者是逐事件的电量，与仿真记录一致）
+T, s, x, E, z = (np.asarray(results[name]).astype(np.int64) for name in ("T", "s", "x", "E", "z"))
+trip_v, trip_j = np.nonzero(z > 0)
+swap_v, swap_j = np.nonzero((z > 0) & (x > 0))
+swap_end = s[swap_v, swap_j] + SWAP_T
+soc_level = paint(np.concatenate([trip_v, swap_v, swap_v]),
+                  np.concatenate([T[trip_v, trip_j] - 30, T[swap_v, swap_j], swap_end]),
+                  np.concatenate([T[trip_v, trip_j], swap_end, swap_end + TRAVEL_AFTER_SWAP_T]),
+                  np.concatenate([E[trip_v, trip_j], E[swap_v, swap_j], np.full(len(swap_v), 100)]), (I, H))
 
 plt.figure(figsize=(14, 6))
 for i in range(I):
@@ -38,16 +40,8 @@ plt.title("SOC Level by Time")
 plt.legend()
 plt.show()
 
-# part 2: queue length by time
-queue_length = [0 for _ in range(H)]
-for i in range(I):
-    for j in range(J):
-        if results['x'][i][j] > 0.5:
-            start_t = int(results['T'][i][j]) + 1
-            end_t = int(results['s'][i][j]) + SWAP_T
-            for t in range(start_t, end_t):
-                if t < H:
-                    queue_length[t] += 1
+# part 2: queue length by time（决定换电到换电结束的车辆数，从任务结束的下一分钟到换电结束）
+queue_length = timeline["in_system"]
 
 plt.figure(figsize=(14, 6))
 plt.plot(queue_length, label="Queue Length")
@@ -59,75 +53,12 @@ plt.legend()
 plt.show()
 
 # part 3: vehicle state by time
-# 0: running, 1: waiting, 2: swapping, 3: traveling_to_station
-vehicle_state = [[0 for _ in range(H)] for _ in range(I)]
-for i in range(I):
-    for j in range(J):
-        if results['z'][i][j] > 0.5 and results['x'][i][j] > 0.5:
-            mission_end_t = int(results['T'][i][j])
-            swap_start_t = int(results['s'][i][j])
-            swap_end_t = int(results['s'][i][j]) + SWAP_T
-            for t in range(mission_end_t, swap_start_t):
-                if t < H:
-                    vehicle_state[i][t] = 1
-            for t in range(swap_start_t, swap_end_t):
-                if t < H:
-                    vehicle_state[i][t] = 2
-            for t in range(swap_end_t, swap_end_t + TRAVEL_AFTER_SWAP_T):
-                if t < H:
-                    vehicle_state[i][t] = 3
-
-# plot it in the gantt chart
-event_colors = {
-    0: 'grey',  # working
-    1: 'blue',  # waiting
-    2: 'green',  # swapping
-    3: 'yellow'  # traveling_to_station
-}
+# 状态编码同 eventTrace.STATES：running, in_trip, traveling_to_station, waiting, swapping
+vehicle_state = timeline["state"]
 
+# plot it in the gantt chart（按状态区间批量绘制，保存文件可用 ganttChart.save_gantt）
 fig, ax = plt.subplots()
-gap = 0.2
-
-# 遍历每个对象
-for i, sequence in enumerate(vehicle_state):
-    start_time = 0
-    # 遍历序列中的每个事件
-    for j, event in enumerate(sequence):
-        # 创建矩形块表示事件
-        rect = patches.Rectangle(
-            (start_time, i + gap / 2),  # x坐标不变，y坐标增加间距
-            1,  # 宽度
-            1 - gap,  # 高度减少间距
-            linewidth=0,  # 去掉默认的边框
-            edgecolor='none',  # 去掉默认的边框
-            facecolor=event_colors[event]
-        )
-        ax.add_patch(rect)
-
-        # 在矩形的顶部和底部绘制水平线来模拟上下边框
-        ax.plot(
-            [start_time, start_time + 1],  # x范围
-            [i + gap / 2, i + gap / 2],  # 下边框的y位置
-            color='black',  # 边框颜色
-            linewidth=1  # 边框宽度
-        )
-        ax.plot(
-            [start_time, start_time + 1],  # x范围
-            [i + gap / 2 + (1 - gap), i + gap / 2 + (1 - gap)],  # 上边框的y位置
-            color='black',  # 边框颜色
-            linewidth=1  # 边框宽度
-        )
-
-        start_time += 1
-
-ax.set_xlim(0, H)
-ax.set_ylim(0, I)
-ax.set_xlabel('Time')
-ax.set_ylabel('Vehicles')
-ax.set_yticks([i+1 for i in range(I)])
-# ax.set_yticks([i + 0.5 for i in range(I)])
-# ax.set_yticklabels(['time' for i in range(I)])
-ax.set_title('Gantt Chart of Events')
+plot_gantt(vehicle_state, ax)
 plt.tight_layout()
 
 plt.show()
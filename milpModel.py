@@ -0,0 +1,243 @@
+import time
+
+import numpy as np
+from scipy import sparse
+
+from modelParams import DEFAULT_PARAMS, FORMULATIONS, initial_state, presolve, time_bound
+from resultStore import RESULT_NAMES
+
+# 变量块：(名称, 类型)，按顺序排列在变量向量中；类型沿用 Gurobi 的 I（整数）、B（0-1）
+VARIABLE_BLOCKS = [("T", "I"), ("s", "I"), ("x", "B"), ("E", "I"), ("z", "B")]
+HIGHS_STATUS = {0: "optimal", 1: "time_limit", 2: "infeasible", 3: "unbounded", 4: "error"}
+
+
+def build_milp(params=None, formulation="pairwise", presolve_model=False):
+    """
+    换电调度模型的稀疏矩阵形式，与求解器无关：max c @ v，row_lb <= A @ v <= row_ub，lb <= v <= ub。
+    参数含义与 gurobiModel.build_model 相同。约束按组整块生成 (行, 列, 系数) 三元组，最后一次性组装成 CSR 矩阵。
+    返回字典：
+    - c / A / row_lb / row_ub / lb / ub / vtype：目标、约束矩阵、约束上下界、变量上下界、变量类型（I/B）；
+    - blocks: 各变量块 {名称: (起始列, 形状)}，index: 各变量块在变量向量中的列号数组（T/s/x/E/z 为 (I, J)）；
+    - families: 各组约束 [(名称, 起始行, 结束行, 方向)]，方向为 "=" / ">" / "<"；
+    - pairs / fixed：与 build_model 返回的相同。
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"未知的模型形式：{formulation}，可选 {FORMULATIONS}")
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    fixed = None
+    if presolve_model:
+        p["J"], z_zero, x_zero, relax_energy = presolve(p)
+        fixed = {"z": z_zero, "x": x_zero, "relax_energy": relax_energy}
+    I, J, H, T_run, T_swap, T_trip = p["I"], p["J"], p["H"], p["T_run"], p["T_swap"], p["T_trip"]
+    C_init, C_swap, Delta, C_min, M = p["C_init"], p["C_swap"], p["Delta"], p["C_min"], p["M"]
+    compact = formulation == "compact"
+    T_first, E_first = initial_state(p)
+    bay_free = p["bay_free"]
+    cycle = T_swap + T_trip + T_run
+
+    # 放开电量下界时，未执行槽的电量最低按每个槽耗电 Delta 顺延
+    relax_energy = fixed is not None and fixed["relax_energy"]
+    E_low = -Delta * J if relax_energy else 0
+
+    # 各组约束的大 M
+    if compact:
+        U = time_bound(p)
+        M_T = U + T_swap + T_trip + T_run  # 时间更新、换电时间
+        M_H = U - H  # 时间窗
+        M_E = max(C_init, C_swap, E_first.max() + Delta) + Delta - E_low  # 电量更新
+    else:
+        U = np.inf
+        M_T = M_H = M_E = M
+
+    # 排序的换电槽对：槽 (i, j) 按 i * J + j 展平，a < b
+    first, second = np.triu_indices(I * J, 1)
+    if fixed is not None:
+        # 不会换电的槽不参与排序
+        swap_slots = ~fixed["x"].reshape(-1)
+        keep = swap_slots[first] & swap_slots[second]
+        first, second = first[keep], second[keep]
+    if compact:
+        # 只保留不同车辆之间的槽对，每对一个变量
+        keep = first // J != second // J
+        first, second = first[keep], second[keep]
+        y_shape = (len(first),)
+    else:
+        y_shape = (2, len(first))
+
+    # 变量
+    blocks, index, vtypes = {}, {}, []
+    num_vars = 0
+    for name, vtype, shape in [(name, vtype, (I, J)) for name, vtype in VARIABLE_BLOCKS] + [("y", "B", y_shape)]:
+        size = int(np.prod(shape))
+        blocks[name] = (num_vars, shape)
+        index[name] = num_vars + np.arange(size).reshape(shape)
+        vtypes.append(np.full(size, vtype))
+        num_vars += size
+    vtype = np.concatenate(vtypes)
+    T, s, x, E, z, y = (index[name] for name in ("T", "s", "x", "E", "z", "y"))
+
+    lb = np.zeros(num_vars)
+    ub = np.where(vtype == "B", 1.0, np.inf)
+    ub[T.reshape(-1)] = ub[s.reshape(-1)] = U
+    # 预处理：固定变量，放开电量下界
+    if fixed is not None:
+        ub[z[fixed["z"]]] = 0
+        ub[x[fixed["x"]]] = 0
+    if relax_energy:
+        lb[E[:, 1:].reshape(-1)] = E_low
+
+    # 目标函数：最大化总运行时间
+    c = np.zeros(num_vars)
+    c[z.reshape(-1)] = T_run
+
+    rows, cols, vals = [], [], []
+    row_lb, row_ub = [], []
+    families = []
+
+    def add(name, terms, low=-np.inf, high=np.inf, sum_last=False):
+        """
+        添加一组约束 low <= sum(coef * v[cols]) <= high。每项 (cols, coef) 中 cols 的形状即约束的形状，
+        sum_last 为 True 时每行对 cols 的最后一维求和。
+        """
+        shape = np.shape(terms[0][0])[:-1] if sum_last else np.shape(terms[0][0])
+        start = sum(len(b) for b in row_lb)
+        row_ids = start + np.arange(int(np.prod(shape))).reshape(shape)
+        if sum_last:
+            row_ids = row_ids[..., None]
+        for term_cols, coef in terms:
+            term_cols = np.asarray(term_cols)
+            rows.append(np.broadcast_to(row_ids, term_cols.shape).reshape(-1))
+            cols.append(term_cols.reshape(-1))
+            vals.append(np.broadcast_to(np.asarray(coef, dtype=float), term_cols.shape).reshape(-1))
+        row_lb.append(np.broadcast_to(np.asarray(low, dtype=float), shape).reshape(-1))
+        row_ub.append(np.broadcast_to(np.asarray(high, dtype=float), shape).reshape(-1))
+        sense = "=" if np.array_equal(low, high) else (">" if np.isinf(high) else "<")
+        families.append((name, start, start + len(row_lb[-1]), sense))
+
+    # 约束条件
+    # 1. 初始任务时间约束
+    add("initial_task_time", [(T[:, 0], 1)], T_first, T_first)
+
+    # 2. 初始电量约束
+    add("initial_energy", [(E[:, 0], 1)], E_first, E_first)
+
+    # 3. 电量与任务执行约束
+    # 出发前电量 >= C_min（放开电量下界时，不执行下一个任务的槽不受约束）
+    add("energy_before_task", [(E[:, :-1], 1), (z[:, 1:], -(C_min - E_low))], low=E_low)
+    # 电量更新逻辑：不换电时减少 Delta，换电后为 C_swap - Delta
+    add("energy_update_1", [(E[:, 1:], 1), (E[:, :-1], -1), (x[:, :-1], M_E)], low=-Delta)
+    add("energy_update_2", [(E[:, 1:], 1), (E[:, :-1], -1), (x[:, :-1], -M_E)], high=-Delta)
+    add("energy_update_3", [(E[:, 1:], 1), (x[:, :-1], M_E)], high=C_swap - Delta + M_E)
+    add("energy_update_4", [(E[:, 1:], 1), (x[:, :-1], -M_E)], low=C_swap - Delta - M_E)
+
+    # 4. 任务时间更新约束
+    add("task_time_update_1", [(T[:, 1:], 1), (T[:, :-1], -1), (x[:, :-1], M_T)], low=T_run)
+    add("task_time_update_2", [(T[:, 1:], 1), (T[:, :-1], -1), (x[:, :-1], -M_T)], high=T_run)
+    add("task_time_update_3", [(T[:, 1:], 1), (s[:, :-1], -1), (x[:, :-1], -M_T)], low=cycle - M_T)
+    add("task_time_update_4", [(T[:, 1:], 1), (s[:, :-1], -1), (x[:, :-1], M_T)], high=cycle + M_T)
+
+    # 5. 时间窗约束
+    add("time_window", [(T, 1), (z, M_H)], high=H + M_H)
+
+    # 6. 任务执行连续性约束
+    add("task_start", [(z[:, 0], 1)], 1, 1)  # 第一个任务必须执行
+    add("task_continuity", [(z[:, 1:], 1), (z[:, :-1], -1)], high=0)
+    add("task_continuity_2", [(z[:, 1:], 1), (x[:, 1:], -1)], low=0)
+
+    # 7. 换电开始时间约束
+    add("swap_start_time", [(s, 1), (T, -1), (x, -M_T)], low=-M_T)
+
+    # 8. 换电站排队约束
+    # 8.1 排队互斥约束
+    s_a, s_b = s.reshape(-1)[first], s.reshape(-1)[second]
+    x_a, x_b = x.reshape(-1)[first], x.reshape(-1)[second]
+    if compact:
+        # y[p] = 1 表示槽 a 先于槽 b 换电，两个槽都换电时才起作用
+        add("queue_constraint", [(s_b, 1), (s_a, -1), (y, -M_T), (x_a, -M_T), (x_b, -M_T)], low=T_swap - 3 * M_T)
+        add("queue_constraint_2", [(s_a, 1), (s_b, -1), (y, M_T), (x_a, -M_T), (x_b, -M_T)], low=T_swap - 2 * M_T)
+    else:
+        # y[0, p] 表示槽 a 先于槽 b 换电，y[1, p] 表示槽 b 先于槽 a 换电
+        add("queue_constraint", [(s_b, 1), (s_a, -1), (y[0], -M)], low=T_swap - M)
+        add("queue_constraint_2", [(s_a, 1), (s_b, -1), (y[1], -M)], low=T_swap - M)
+        # 仅当两个槽都换电时生效
+        add("y_activation_x", [(y[0], 1), (y[1], 1), (x_a, -1)], high=0)
+        add("y_activation_y", [(y[0], 1), (y[1], 1), (x_b, -1)], high=0)
+        add("y_activation_z", [(y[0], 1), (y[1], 1), (x_a, -1), (x_b, -1)], low=-1)
+
+    # 8.2 确保仅换电事件生效
+    add("swap_event", [(s, 1), (x, -M_T)], high=0)
+
+    # 8.3 换电站在 bay_free 之前被占用
+    if bay_free > 0:
+        add("bay_free", [(s, 1), (x, -bay_free)], low=0)
+
+    # 9. 对称性破除：车辆初始状态相同时，按执行任务数从多到少编号
+    identical = np.all(T_first == T_first[0]) and np.all(E_first == E_first[0])
+    if compact and I > 1 and identical:
+        add("symmetry", [(z[:-1], 1), (z[1:], -1)], low=0, sum_last=True)
+
+    num_rows = sum(len(b) for b in row_lb)
+    A = sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                          shape=(num_rows, num_vars))
+    return {
+        "c": c, "A": A, "row_lb": np.concatenate(row_lb), "row_ub": np.concatenate(row_ub),
+        "lb": lb, "ub": ub, "vtype": vtype, "blocks": blocks, "index": index, "families": families,
+        "pairs": (first, second), "fixed": fixed,
+    }
+
+
+def to_gurobi(form, name="Battery_Swap_Scheduling"):
+    """
+    把 build_milp 的稀疏形式整块导入 gurobipy：每个变量块一个矩阵变量，每组约束一次 addMConstr。
+    返回模型和与 build_model 相同的变量字典（T/s/x/E/z/y、pairs、fixed）。
+    """
+    from gurobipy import GRB, Model, MVar
+
+    model = Model(name)
+    variables = {}
+    for block, (start, shape) in form["blocks"].items():
+        stop = start + int(np.prod(shape))
+        variables[block] = model.addMVar(shape, lb=form["lb"][start:stop].reshape(shape),
+                                         ub=form["ub"][start:stop].reshape(shape),
+                                         obj=form["c"][start:stop].reshape(shape),
+                                         vtype=form["vtype"][start:stop].reshape(shape), name=block)
+    model.ModelSense = GRB.MAXIMIZE
+    model.update()
+    v = MVar.fromlist(model.getVars())
+    for family, start, stop, sense in form["families"]:
+        rhs = form["row_ub"][start:stop] if sense == "<" else form["row_lb"][start:stop]
+        model.addMConstr(form["A"][start:stop], v, sense, rhs, name=family)
+    variables.update(pairs=form["pairs"], fixed=form["fixed"])
+    return model, variables
+
+
+def solve_highs(form, time_limit=None, mip_rel_gap=1e-4, verbose=False):
+    """
+    用 scipy.optimize.milp（HiGHS）求解 build_milp 的稀疏形式，不需要 Gurobi 许可证。
+    返回 T/s/x/E/z 结果字典（无可行解时为 None）和求解信息（status 见 HIGHS_STATUS）。
+    """
+    from scipy.optimize import Bounds, LinearConstraint, milp
+
+    options = {"disp": verbose, "mip_rel_gap": mip_rel_gap}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+    start_time = time.perf_counter()
+    # milp 求最小值
+    res = milp(-form["c"], integrality=(form["vtype"] != "C").astype(int), bounds=Bounds(form["lb"], form["ub"]),
+               constraints=LinearConstraint(form["A"], form["row_lb"], form["row_ub"]), options=options)
+    runtime = time.perf_counter() - start_time
+
+    has_solution = res.x is not None
+    bound = getattr(res, "mip_dual_bound", None)
+    info = {
+        "status": HIGHS_STATUS.get(res.status, "error"),
+        "objective": -res.fun if has_solution else None,
+        "bound": -bound if has_solution and bound is not None else None,
+        "gap": getattr(res, "mip_gap", None) if has_solution else None,
+        "runtime": runtime,
+        "nodes": getattr(res, "mip_node_count", None),
+    }
+    results = None
+    if has_solution:
+        results = {name: np.rint(res.x[form["index"][name]]).astype(np.int64) for name in RESULT_NAMES}
+    return results, info
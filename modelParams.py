@@ -0,0 +1,92 @@
+import numpy as np
+
+# 参数设置
+I = 3  # 车辆数
+J = 24  # 最大任务次数（根据实际情况调整）
+H = 720  # 规划时窗（分钟）
+ST = 0  # 起始时间
+T_run = 30  # 单趟任务时间
+T_swap = 8  # 换电操作时间
+T_trip = 20  # 往返换电站时间
+C_init = 100  # 初始电量
+C_swap = 100  # 换电后电量
+Delta = 10  # 每趟耗电
+C_min = 25  # 最低电量阈值
+M = 10000  # 足够大的常数
+
+# 初始状态（滚动时域中由上一个窗口给出），默认所有车辆从 0 时刻满电出发、换电站空闲
+# T_first / E_first: 每辆车第一个任务的完成时间和完成后的电量，None 表示 T_run 和 C_init - Delta
+# bay_free: 换电站最早可以开始换电的时间
+DEFAULT_PARAMS = {
+    "I": I, "J": J, "H": H, "ST": ST, "T_run": T_run, "T_swap": T_swap, "T_trip": T_trip,
+    "C_init": C_init, "C_swap": C_swap, "Delta": Delta, "C_min": C_min, "M": M,
+    "T_first": None, "E_first": None, "bay_free": 0,
+}
+
+# pairwise: 原始模型，所有换电槽两两排序，统一使用大 M
+# compact: 由时窗推出的紧 M，只对不同车辆的换电槽排序且每对一个变量，并按车辆对称性破除
+FORMULATIONS = ["pairwise", "compact"]
+
+
+def time_bound(params):
+    """
+    compact 模型中 T、s 的上界。时窗内的换电不受影响，时窗外的换电可以依次紧排在 H 之后
+    （至多 I * J 次），之后不再执行任务，每个任务时间加 T_run。
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    return max(p["H"], p["bay_free"]) + (p["I"] * p["J"] + 1) * p["T_swap"] + p["T_trip"] + p["J"] * p["T_run"]
+
+
+def initial_state(params):
+    """每辆车第一个任务的完成时间和电量 (T_first, E_first)，均为长度 I 的数组"""
+    p = {**DEFAULT_PARAMS, **params}
+    T_first = np.full(p["I"], p["T_run"]) if p["T_first"] is None else np.asarray(p["T_first"])
+    E_first = np.full(p["I"], p["C_init"] - p["Delta"]) if p["E_first"] is None else np.asarray(p["E_first"])
+    return T_first, E_first
+
+
+def earliest_times(params):
+    """
+    每辆车各任务槽的最早完成时间，形状 (I, K)，到不了的槽为 inf，K 为任一车辆在时窗内能到的槽数。
+    不计排队，只在不换电就无法执行下一个任务时才换电（换电越晚、次数越少，完成得越早）。
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    H, T_run, C_swap, Delta, C_min = p["H"], p["T_run"], p["C_swap"], p["Delta"], p["C_min"]
+    cycle = p["T_swap"] + p["T_trip"] + T_run
+    T_first, E_first = initial_state(p)
+    rows = []
+    for t, e in zip(T_first, E_first):
+        row = [t]
+        # 执行任务 j 需要 E[j-1] >= C_min；E[j] 低于 C_min 时必须在 j-1 换电才能执行任务 j+1
+        while e >= C_min and t + T_run <= H:
+            row.append(t + T_run)
+            if e - Delta < C_min and C_swap - Delta >= C_min:
+                t, e = t + cycle, C_swap - Delta
+            else:
+                t, e = t + T_run, e - Delta
+        rows.append(row)
+    K = max(len(row) for row in rows)
+    return np.array([row + [np.inf] * (K - len(row)) for row in rows], dtype=float)
+
+
+def presolve(params):
+    """
+    建模前的预处理，返回任务槽数 J 以及可以固定为 0 的 z、x（(I, J) 的布尔数组）：
+    - J 取任一车辆在时窗内最多能到的槽数，多出的槽不可能执行；
+    - 最早完成时间超过 H 的任务不能执行，对应的换电也不能发生；
+    - 最后一个槽以及换电后下一个任务必然超出时窗的槽不需要换电。
+    后一条依赖于放开未执行槽的电量下界（否则模型需要在时窗外换电来保持电量非负），
+    只在 C_min >= Delta 时成立：此时执行过的任务电量自然非负。
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    earliest = earliest_times(p)
+    J = max(2, earliest.shape[1])
+    earliest = np.pad(earliest, ((0, 0), (0, J - earliest.shape[1])), constant_values=np.inf)
+    relax_energy = p["C_min"] >= p["Delta"]
+
+    z_zero = earliest > p["H"]
+    x_zero = z_zero.copy()
+    x_zero[:, -1] = True
+    if relax_energy:
+        x_zero |= earliest + p["T_swap"] + p["T_trip"] + p["T_run"] > p["H"]
+    return J, z_zero, x_zero, relax_energy
@@ -0,0 +1,162 @@
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from smartCharging import CHARGINGTIME, TRIPTIME, simulate_event_driven
+from batchSimulation import PARAM_NAMES
+from simulationMetrics import TotalsOnlyMetrics
+
+try:
+    from scipy import stats
+except ImportError:  # 没有 scipy 时用正态分位数近似
+    stats = None
+
+
+class Distribution:
+    """
+    时长分布，kind 为 numpy Generator 的分布方法名（normal、uniform、triangular、gamma、lognormal 等），
+    或 "constant"。抽样结果四舍五入到整分钟，且不小于 1 分钟。
+    """
+    def __init__(self, kind, *args):
+        self.kind = kind
+        self.args = args
+
+    def sample(self, rng, size):
+        if self.kind == "constant":
+            return np.full(size, self.args[0], dtype=np.int64)
+        values = getattr(rng, self.kind)(*self.args, size=size)
+        return np.maximum(1, np.rint(values)).astype(np.int64)
+
+    def __repr__(self):
+        return f"Distribution({self.kind!r}, {', '.join(map(repr, self.args))})"
+
+
+# 默认的随机时长，均值与固定时长一致
+DEFAULT_DISTRIBUTIONS = {
+    "trip": Distribution("normal", TRIPTIME, 5),
+    "swap": Distribution("triangular", CHARGINGTIME - 2, CHARGINGTIME, CHARGINGTIME + 4),
+    "travel": Distribution("uniform", 8, 12),
+    "back": Distribution("uniform", 8, 12),
+}
+PURPOSES = ["trip", "swap", "travel", "back"]
+
+
+class StochasticDurations:
+    """
+    每辆车、每种时长各用一条独立的随机数流，流由 (seed, replication, 车辆, 用途) 决定。
+    不同策略使用相同的 seed 和 replication 时，第 k 次行程/换电/往返的时长完全相同（公共随机数）。
+    """
+    def __init__(self, seed, replication, distributions=None, block_size=64):
+        self.seed = seed
+        self.replication = replication
+        self.distributions = {**DEFAULT_DISTRIBUTIONS, **(distributions or {})}
+        self.block_size = block_size
+        self.streams = {}  # (车辆, 用途) -> [rng, 预先抽好的样本, 下一个位置]
+
+    def draw(self, vehicle_id, purpose):
+        key = (vehicle_id, purpose)
+        stream = self.streams.get(key)
+        if stream is None:
+            seed_seq = np.random.SeedSequence(self.seed, spawn_key=(self.replication, vehicle_id, PURPOSES.index(purpose)))
+            stream = self.streams[key] = [np.random.default_rng(seed_seq), None, self.block_size]
+        if stream[2] == self.block_size:
+            stream[1] = self.distributions[purpose].sample(stream[0], self.block_size).tolist()
+            stream[2] = 0
+        value = stream[1][stream[2]]
+        stream[2] += 1
+        return value
+
+    def trip_time(self, vehicle_id):
+        return self.draw(vehicle_id, "trip")
+
+    def swap_time(self, vehicle_id):
+        return self.draw(vehicle_id, "swap")
+
+    def travel_time(self, vehicle_id):
+        return self.draw(vehicle_id, "travel")
+
+    def back_time(self, vehicle_id):
+        return self.draw(vehicle_id, "back")
+
+
+def run_replication(policies, replication, seed, distributions=None, num_vehicles=None, simulation_time=None,
+                    common_random_numbers=True):
+    """在一个子进程中用同一次重复的随机数计算所有策略，返回各策略的总运行时间"""
+    res = []
+    for k, policy in enumerate(policies):
+        # 不使用公共随机数时，每个策略换一个 seed
+        policy_seed = seed if common_random_numbers else (seed, k)
+        durations = StochasticDurations(policy_seed, replication, distributions)
+        res.append(simulate_event_driven(*policy, num_vehicles=num_vehicles, simulation_time=simulation_time,
+                                         durations=durations, metrics=TotalsOnlyMetrics())[0])
+    return res
+
+
+def run_monte_carlo(policies, num_replications=30, seed=0, distributions=None, num_vehicles=None,
+                    simulation_time=None, processes=None, common_random_numbers=True):
+    """
+    对每个策略做 num_replications 次随机重复，重复之间并行计算。
+    policies: (high, low, swap_ready, alpha, dec) 的列表
+    返回每行一个 (策略, 重复) 的 DataFrame
+    """
+    policies = [tuple(float(p) for p in policy) for policy in policies]
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as executor:
+        futures = [executor.submit(run_replication, policies, r, seed, distributions, num_vehicles, simulation_time,
+                                   common_random_numbers)
+                   for r in range(num_replications)]
+        runs = [future.result() for future in futures]
+
+    records = []
+    for r, res in enumerate(runs):
+        for k, total_runtime in enumerate(res):
+            records.append((k, *policies[k], r, total_runtime))
+    return pd.DataFrame(records, columns=["policy", *PARAM_NAMES, "replication", "total_runtime"])
+
+
+def confidence_interval(values, confidence=0.95):
+    """均值及其置信区间 (mean, low, high)"""
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    mean = values.mean()
+    if n < 2:
+        return mean, np.nan, np.nan
+    if stats is not None:
+        q = stats.t.ppf((1 + confidence) / 2, n - 1)
+    else:
+        q = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    half = q * values.std(ddof=1) / np.sqrt(n)
+    return mean, mean - half, mean + half
+
+
+def summarize(df, confidence=0.95):
+    """每个策略的平均总运行时间和置信区间，按均值从大到小排列"""
+    rows = []
+    for k, group in df.groupby("policy"):
+        mean, low, high = confidence_interval(group["total_runtime"], confidence)
+        rows.append((k, *group[PARAM_NAMES].iloc[0], len(group), mean, low, high))
+    res = pd.DataFrame(rows, columns=["policy", *PARAM_NAMES, "replications", "mean", "ci_low", "ci_high"])
+    return res.sort_values("mean", ascending=False).reset_index(drop=True)
+
+
+def compare_to_best(df, confidence=0.95):
+    """
+    各策略与均值最大的策略逐次重复配对求差。使用公共随机数时配对差的方差远小于两个独立均值之差，
+    置信区间上界小于 0 的策略可以判定为显著更差。
+    """
+    table = df.pivot(index="replication", columns="policy", values="total_runtime")
+    best = table.mean().idxmax()
+    rows = []
+    for k in table.columns:
+        mean, low, high = confidence_interval(table[k] - table[best], confidence)
+        rows.append((k, mean, low, high, k != best and high < 0))
+    return pd.DataFrame(rows, columns=["policy", "diff_to_best", "ci_low", "ci_high", "worse"])
+
+
+if __name__ == "__main__":
+    policies = [(90, 35, 100, alpha, dec) for alpha in (0.7, 0.8, 0.9, 1.0) for dec in (0.5, 0.6, 0.7)]
+    df = run_monte_carlo(policies, num_replications=40, seed=2024)
+    print(summarize(df))
+    print(compare_to_best(df))
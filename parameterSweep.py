@@ -0,0 +1,107 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from smartCharging import simulate, simulate_event_driven
+from batchSimulation import PARAM_NAMES, param_grid, simulate_batch
+from simulationMetrics import TotalsOnlyMetrics
+
+
+ENGINES = ["simulate", "event", "batch"]
+
+
+def open_store(store_path):
+    """打开（或新建）结果库，每个参数点一行，参数作为主键"""
+    conn = sqlite3.connect(store_path)
+    columns = ", ".join(f"{name} REAL NOT NULL" for name in PARAM_NAMES)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS results ({columns}, total_runtime REAL NOT NULL, "
+                 f"PRIMARY KEY ({', '.join(PARAM_NAMES)}))")
+    conn.commit()
+    return conn
+
+
+def completed_points(conn):
+    """结果库中已经算完的参数点"""
+    return set(conn.execute(f"SELECT {', '.join(PARAM_NAMES)} FROM results"))
+
+
+def evaluate_chunk(points, engine="event"):
+    """在子进程中计算一批参数点，返回 [(参数, 总运行时间), ...]"""
+    if engine == "batch":
+        return list(zip(points, simulate_batch(np.array(points)).tolist()))
+    simulate_fn = simulate if engine == "simulate" else simulate_event_driven
+    return [(point, simulate_fn(*point, metrics=TotalsOnlyMetrics())[0]) for point in points]
+
+
+def run_sweep(points, store_path="sweep_results.sqlite", processes=None, chunk_size=16, engine="event"):
+    """
+    把参数点分块分配到进程池中计算，每块完成后立即写入结果库。
+    中断后重新运行会跳过结果库中已有的点。
+    points: 可迭代的 (high, low, swap_ready, alpha, dec)
+    返回本次新计算的点数
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"未知的仿真引擎：{engine}，可选 {ENGINES}")
+
+    conn = open_store(store_path)
+    done = completed_points(conn)
+    todo = []
+    for point in points:
+        point = tuple(float(p) for p in point)
+        if point not in done:
+            done.add(point)
+            todo.append(point)
+    chunks = [todo[k:k + chunk_size] for k in range(0, len(todo), chunk_size)]
+
+    placeholders = ", ".join("?" for _ in range(len(PARAM_NAMES) + 1))
+    try:
+        with ProcessPoolExecutor(max_workers=processes or os.cpu_count()) as executor:
+            futures = [executor.submit(evaluate_chunk, chunk, engine) for chunk in chunks]
+            for future in as_completed(futures):
+                conn.executemany(f"INSERT OR REPLACE INTO results VALUES ({placeholders})",
+                                 [(*point, total_runtime) for point, total_runtime in future.result()])
+                conn.commit()
+    finally:
+        conn.close()
+    return len(todo)
+
+
+def load_results(store_path="sweep_results.sqlite"):
+    """读取结果库，每行一个参数点"""
+    conn = open_store(store_path)
+    try:
+        return pd.read_sql_query(f"SELECT * FROM results ORDER BY {', '.join(PARAM_NAMES)}", conn)
+    finally:
+        conn.close()
+
+
+def results_matrix(df, index="alpha", columns="dec", values="total_runtime", fixed=None):
+    """
+    转换成与原脚本 res_arr 相同布局的矩阵（行 alpha，列 dec）。
+    fixed: 其余参数的取值，如 {"high_battery_threshold": 90, ...}，先筛出这一切片；
+    切片中同一格有多个点（其余参数不止一组取值）时报错，不做平均。
+    """
+    for name, value in (fixed or {}).items():
+        df = df[np.isclose(df[name], value)]
+    return df.pivot(index=index, columns=columns, values=values)
+
+
+if __name__ == "__main__":
+    swap_ready_threshold = 100
+    high_threshold = 90
+    low_threshold = 35
+
+    grid = param_grid([high_threshold], [low_threshold], [swap_ready_threshold],
+                      [i / 20 for i in range(21)], [j / 20 for j in range(21)])
+    n_new = run_sweep(grid)
+    print(f"新计算 {n_new} 个参数点")
+
+    df = results_matrix(load_results(), fixed={"high_battery_threshold": high_threshold,
+                                               "low_battery_threshold": low_threshold,
+                                               "swap_ready_threshold": swap_ready_threshold})
+    max_res = df.values.max()
+    print("最大总运行时间：", max_res, "分钟")
+    print("最优 (alpha, dec)：", [(a, d) for a, d in df.stack().index if df.loc[a, d] == max_res])
@@ -0,0 +1,146 @@
+import argparse
+import glob
+
+import numpy as np
+import pandas as pd
+
+from batchSimulation import PARAM_NAMES, needs_swap, param_grid, simulate_batch
+from eventTrace import STATE_CHANGE, STATE_CODES, EventTrace
+from resultStore import load_results
+from smartCharging import MAX_QUEUE_LENGTH, simulate_event_driven
+from timeline import queue_at, swap_intervals_from_results, swap_intervals_from_trace
+
+# 默认的搜索范围：high、low、alpha、dec，swap_ready 不影响换电决策，验证时取 FIT_SWAP_READY
+FIT_GRID = {
+    "high_battery_threshold": np.arange(50, 101, 5),
+    "low_battery_threshold": np.arange(10, 61, 5),
+    "alpha": np.linspace(0, 1, 11),
+    "dec": np.linspace(0, 1, 21),
+}
+FIT_SWAP_READY = 100
+
+
+def decision_points(results):
+    """
+    一组 MIP 解中每个决策点的电量、排队车辆数和是否换电，返回等长数组的字典。
+    决策点为执行完任务 j 且继续执行任务 j + 1 的时刻 T[j]，排队车辆数与仿真中传给 needs_swap 的相同：
+    已决定换电（任务结束）、还没有开始换电的其他车辆数，同一分钟按车辆编号先后（见 timeline.queue_at）。
+    """
+    T, x, E, z = (np.asarray(results[name]).astype(np.int64) for name in ("T", "x", "E", "z"))
+    vehicle, slot = np.nonzero((z[:, :-1] > 0) & (z[:, 1:] > 0))
+    queue = queue_at(T[vehicle, slot], vehicle, *swap_intervals_from_results(results), len(T))
+    return {"soc": E[vehicle, slot].astype(float), "queue": queue, "swap": x[vehicle, slot] > 0}
+
+
+def decision_points_from_trace(trace, num_vehicles, simulation_time):
+    """仿真记录中每个行程结束的电量、排队车辆数和是否换电，排队车辆数的算法与 decision_points 相同"""
+    records = np.asarray(trace)
+    ends = records[(records["kind"] == STATE_CHANGE) & (records["old_state"] == STATE_CODES["in_trip"])]
+    queue = queue_at(ends["time"], ends["vehicle"], *swap_intervals_from_trace(records, simulation_time),
+                     num_vehicles)
+    return {"soc": ends["soc"].astype(float), "queue": queue,
+            "swap": ends["new_state"] == STATE_CODES["traveling_to_station"]}
+
+
+def simulated_queue(trace):
+    """
+    仿真中每个行程结束时实际传给 needs_swap 的排队车辆数（前往和排队换电的车辆数）：
+    记录按处理顺序写入，累计进入和离开这两个状态的车辆数，取行程结束记录之前的值。
+    """
+    records = np.asarray(trace)
+    records = records[records["kind"] == STATE_CHANGE]
+    queued = [STATE_CODES["traveling_to_station"], STATE_CODES["waiting"]]
+    delta = np.isin(records["new_state"], queued).astype(np.int64) - np.isin(records["old_state"], queued)
+    before = np.cumsum(delta) - delta
+    return before[records["old_state"] == STATE_CODES["in_trip"]]
+
+
+def check_trace_features(policy, num_vehicles=50, simulation_time=1440, num_batteries=10):
+    """
+    用 simulate_event_driven 仿真一组策略，检查 decision_points_from_trace 的排队车辆数与仿真中传给 needs_swap 的
+    完全相同，且把这些特征代入 needs_swap 能复现仿真中的全部换电决策。返回 (排队数不同的个数, 决策不同的个数)。
+    """
+    recorder = EventTrace()
+    simulate_event_driven(*policy, num_vehicles, simulation_time, num_batteries, trace=recorder)
+    trace = recorder.to_array()
+    points = decision_points_from_trace(trace, num_vehicles, simulation_time)
+    high, low, _, alpha, dec = policy
+    predicted = needs_swap(points["soc"], points["queue"], MAX_QUEUE_LENGTH, high, low, alpha, dec)
+    return int((points["queue"] != simulated_queue(trace)).sum()), int((predicted != points["swap"]).sum())
+
+
+def gather_dataset(paths):
+    """从多个结果文件收集决策点，合并成一个数组数据集，instance 为决策点所属文件的序号"""
+    parts = []
+    for k, path in enumerate(paths):
+        results, meta = load_results(path)
+        points = decision_points(results)
+        points["instance"] = np.full(len(points["soc"]), k)
+        parts.append(points)
+    if not parts:
+        raise ValueError("没有可用的结果文件")
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def fit_policy(dataset, grid=None, max_length=MAX_QUEUE_LENGTH, metric="balanced", chunk_size=2048):
+    """
+    在参数网格上一次性向量化计算 needs_swap，统计与最优换电决策的一致率。
+    agreement 为一致率，balanced 为换电和不换电两类的平均召回率：最优解中换电决策很少，
+    只看 agreement 时从不换电的参数也能得到很高的一致率，所以默认按 balanced 排序。
+    返回按 metric 从高到低排序的 DataFrame（参数列同 PARAM_NAMES）。
+    """
+    grid = {**FIT_GRID, **(grid or {})}
+    candidates = param_grid(grid["high_battery_threshold"], grid["low_battery_threshold"], [FIT_SWAP_READY],
+                            grid["alpha"], grid["dec"])
+    candidates = candidates[candidates[:, 0] > candidates[:, 1]]
+    soc, queue, swap = dataset["soc"][None, :], dataset["queue"][None, :], dataset["swap"][None, :]
+    num_swap = max(int(swap.sum()), 1)
+    num_keep = max(int((~swap).sum()), 1)
+
+    agreement, balanced = [], []
+    # 分块计算，避免 (参数组数, 决策点数) 的矩阵过大
+    for k in range(0, len(candidates), chunk_size):
+        high, low, _, alpha, dec = (column[:, None] for column in candidates[k:k + chunk_size].T)
+        predicted = needs_swap(soc, queue, max_length, high, low, alpha, dec)
+        agreement.append((predicted == swap).mean(axis=1))
+        balanced.append(((predicted & swap).sum(axis=1) / num_swap + (~predicted & ~swap).sum(axis=1) / num_keep) / 2)
+
+    df = pd.DataFrame(candidates, columns=PARAM_NAMES)
+    df["agreement"] = np.concatenate(agreement)
+    df["balanced"] = np.concatenate(balanced)
+    other = "agreement" if metric == "balanced" else "balanced"
+    return df.sort_values([metric, other], ascending=False, kind="stable").reset_index(drop=True)
+
+
+def validate_policies(fitted, top=50, num_vehicles=None, simulation_time=None, num_batteries=10):
+    """用 simulate_batch 同时仿真 fit_policy 排在前面的 top 组参数，按总运行时间排序（相同时保持拟合的顺序）"""
+    df = fitted.head(top).copy()
+    df["total_runtime"] = simulate_batch(df[PARAM_NAMES].to_numpy(), num_vehicles, simulation_time, num_batteries)
+    return df.sort_values("total_runtime", ascending=False, kind="stable").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="从 MIP 最优解拟合 needs_swap 的参数并用批量仿真验证")
+    parser.add_argument("paths", nargs="*", help="结果文件，默认为当前目录下的 results_*.npz")
+    parser.add_argument("--top", type=int, default=50, help="验证一致率最高的参数组数")
+    parser.add_argument("--check-trace", type=int, default=0, metavar="N",
+                        help="只检查：随机抽取 N 组策略仿真，核对决策特征与仿真中传给 needs_swap 的相同")
+    args = parser.parse_args()
+
+    if args.check_trace:
+        rng = np.random.default_rng(0)
+        for _ in range(args.check_trace):
+            low = int(rng.integers(10, 61))
+            policy = (int(rng.integers(low + 1, 101)), low, int(rng.integers(50, 101)),
+                      round(float(rng.random()), 2), round(float(rng.random()), 2))
+            print(policy, "排队数 / 决策不一致：", *check_trace_features(policy))
+        raise SystemExit
+
+    paths = args.paths or sorted(glob.glob("results_*.npz"))
+    dataset = gather_dataset(paths)
+    print(f"{len(paths)} 个结果文件，{len(dataset['soc'])} 个决策点，其中换电 {int(dataset['swap'].sum())} 次")
+    fitted = fit_policy(dataset)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(fitted.head(10))
+        validated = validate_policies(fitted, args.top)
+        print(validated.head(10))
@@ -0,0 +1,134 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import RBFInterpolator
+
+from batchSimulation import PARAM_NAMES
+from parameterSweep import ENGINES, load_results, run_sweep
+
+# 各参数的 (下界, 上界, 步长)，顺序同 PARAM_NAMES；只搜索网格上的点，便于记忆化
+SEARCH_SPACE = {
+    "high_battery_threshold": (50, 100, 5),
+    "low_battery_threshold": (10, 60, 5),
+    "swap_ready_threshold": (50, 100, 5),
+    "alpha": (0, 1, 0.05),
+    "dec": (0, 1, 0.05),
+}
+
+
+def space_arrays(space=None):
+    space = {**SEARCH_SPACE, **(space or {})}
+    lower, upper, step = (np.array([space[name][k] for name in PARAM_NAMES], dtype=float) for k in range(3))
+    return lower, upper, step
+
+
+def snap(points, space=None):
+    """把点取整到搜索网格上，去掉 high <= low 的点和重复点"""
+    lower, upper, step = space_arrays(space)
+    points = np.clip(np.round((np.atleast_2d(points) - lower) / step) * step + lower, lower, upper)
+    points = np.round(points, 6)
+    points = points[points[:, 0] > points[:, 1]]
+    return np.unique(points, axis=0)
+
+
+def random_points(rng, n, space=None):
+    lower, upper, _ = space_arrays(space)
+    return snap(rng.uniform(lower, upper, size=(n, len(PARAM_NAMES))), space)
+
+
+def neighbors(rng, centers, n, space=None, max_steps=2):
+    """在 centers 附近随机移动若干个网格步长"""
+    _, _, step = space_arrays(space)
+    picked = centers[rng.integers(len(centers), size=n)]
+    moves = rng.integers(-max_steps, max_steps + 1, size=picked.shape)
+    # 每个点只改动随机的一部分参数
+    moves *= rng.random(picked.shape) < 0.5
+    return snap(picked + moves * step, space)
+
+
+def evaluated(store_path):
+    """结果库中已经仿真过的点和总运行时间"""
+    df = load_results(store_path)
+    return df[PARAM_NAMES].to_numpy(dtype=float), df["total_runtime"].to_numpy(dtype=float)
+
+
+def search_policies(budget=400, batch_size=32, initial=64, store_path="policy_search.sqlite", processes=None,
+                    engine="event", seed=0, num_proposals=4096, explore=0.25, space=None):
+    """
+    以代理模型引导的自适应搜索五个策略参数（顺序同 PARAM_NAMES），最大化总运行时间。
+    先随机仿真 initial 个点，之后每轮用已仿真点拟合 RBF 代理模型，在当前最好的点附近和全空间随机生成候选，
+    取代理预测最高的点（其中 explore 比例为随机点）组成一批，由 parameterSweep.run_sweep 并行仿真。
+    仿真结果存在 store_path 中，已经仿真过的点不会重复计算，中断后可以继续；
+    budget 为本次新仿真的点数上限。
+    返回全部已仿真点（按总运行时间排序）和每轮的记录。
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"未知的仿真引擎：{engine}，可选 {ENGINES}")
+    rng = np.random.default_rng(seed)
+    lower, upper, _ = space_arrays(space)
+    spent = 0
+    history = []
+
+    def evaluate(points):
+        nonlocal spent
+        points = points[:budget - spent]
+        if len(points):
+            spent += run_sweep(points, store_path, processes, chunk_size=max(1, len(points) // 8), engine=engine)
+
+    X, y = evaluated(store_path)
+    if len(X) < initial:
+        evaluate(random_points(rng, initial - len(X), space))
+
+    while spent < budget:
+        X, y = evaluated(store_path)
+        history.append({"round": len(history), "evaluations": len(X), "new": spent, "best": y.max()})
+        # 代理模型：参数归一化到 [0, 1]，带平滑的薄板样条
+        scale = upper - lower
+        surrogate = RBFInterpolator((X - lower) / scale, y, smoothing=1e-3 * len(X))
+
+        top = X[np.argsort(-y, kind="stable")[:batch_size]]
+        candidates = np.concatenate([neighbors(rng, top, num_proposals, space),
+                                     random_points(rng, num_proposals // 4, space)])
+        candidates = np.unique(candidates, axis=0)
+        # 去掉已经仿真过的点
+        known = {tuple(point) for point in X}
+        candidates = candidates[[tuple(point) not in known for point in candidates]]
+        if not len(candidates):
+            break
+
+        num_explore = int(round(batch_size * explore))
+        predicted = surrogate((candidates - lower) / scale)
+        order = np.argsort(-predicted, kind="stable")
+        exploit = candidates[order[:batch_size - num_explore]]
+        rest = candidates[order[batch_size - num_explore:]]
+        batch = np.concatenate([exploit, rest[rng.permutation(len(rest))[:num_explore]]])
+        before = spent
+        evaluate(batch)
+        if spent == before:
+            break
+
+    X, y = evaluated(store_path)
+    history.append({"round": len(history), "evaluations": len(X), "new": spent, "best": y.max()})
+    df = pd.DataFrame(X, columns=PARAM_NAMES)
+    df["total_runtime"] = y
+    return df.sort_values("total_runtime", ascending=False, kind="stable").reset_index(drop=True), \
+        pd.DataFrame(history)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="代理模型引导的五参数换电策略搜索")
+    parser.add_argument("--budget", type=int, default=400, help="本次新仿真的点数上限")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--store", default="policy_search.sqlite", help="结果库，已仿真的点不会重复计算")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--engine", default="event", choices=ENGINES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results, history = search_policies(args.budget, args.batch_size, store_path=args.store, processes=args.processes,
+                                       engine=args.engine, seed=args.seed)
+    print(history)
+    print(results.head(10))
+    grid_size = int(np.prod([np.floor((high - low) / step + 1e-9) + 1 for low, high, step in SEARCH_SPACE.values()]))
+    print(f"仿真 {len(results)} 个点，约为完整网格 {grid_size} 个点的 {len(results) / grid_size:.2%}")
@@ -0,0 +1,99 @@
+import json
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# 结果文件为未压缩的 .npz：T/s/x/E/z 各一个 (I, J) 整数数组，meta 为参数和求解信息的 JSON 字符串
+FORMAT_VERSION = 1
+RESULT_NAMES = ("T", "s", "x", "E", "z")
+
+
+def result_path(params, suffix=".npz"):
+    """与原来的 results_I_{I}_J_{J}_H_{H}.pkl 相同的命名"""
+    return f"results_I_{params['I']}_J_{params['J']}_H_{params['H']}{suffix}"
+
+
+def extract_results(model, variables):
+    """一次性读出 T/s/x/E/z 的当前解，取整为 int64 数组"""
+    return {name: np.rint(variables[name].X).astype(np.int64) for name in RESULT_NAMES}
+
+
+def solve_info(model):
+    """求解状态、目标值、界、gap 和用时"""
+    has_solution = model.SolCount > 0
+    return {
+        "status": model.Status,
+        "objective": model.ObjVal if has_solution else None,
+        "bound": model.ObjBound if model.IsMIP and has_solution else None,
+        "gap": model.MIPGap if model.IsMIP and has_solution else None,
+        "runtime": model.Runtime,
+        "sol_count": model.SolCount,
+    }
+
+
+def jsonable(value):
+    """把参数和求解信息中的 numpy 类型转换成可以写入 JSON 的 Python 类型"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {k: jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    return value
+
+
+def save_results(path, results, params=None, info=None):
+    """保存一组解（T/s/x/E/z 可以是数组或嵌套列表）及其参数和求解信息"""
+    arrays = {name: np.ascontiguousarray(results[name], dtype=np.int64) for name in RESULT_NAMES}
+    meta = {"format_version": FORMAT_VERSION, "params": jsonable(params or {}), "info": jsonable(info or {})}
+    np.savez(path, meta=np.array(json.dumps(meta, ensure_ascii=False)), **arrays)
+
+
+def _mmap_member(path, archive, name):
+    """未压缩的 .npz 成员直接按文件偏移做内存映射"""
+    member = archive.getinfo(f"{name}.npy")
+    if member.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, "rb") as f:
+        # 本地文件头 30 字节，其后是文件名和扩展字段
+        f.seek(member.header_offset + 26)
+        name_len, extra_len = np.frombuffer(f.read(4), dtype="<u2")
+        f.seek(member.header_offset + 30 + int(name_len) + int(extra_len))
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(f)
+        offset = f.tell()
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran_order else "C")
+
+
+def load_results(path, mmap=True):
+    """
+    读取结果文件，返回 (results, meta)，results 为 T/s/x/E/z 数组的字典。
+    mmap 为 True 时数组以只读内存映射方式打开，读取大量结果时只有用到的部分才会载入内存。
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].item())
+        if meta["format_version"] > FORMAT_VERSION:
+            raise ValueError(f"{path} 的格式版本 {meta['format_version']} 高于当前支持的 {FORMAT_VERSION}")
+        results = None
+        if mmap:
+            with zipfile.ZipFile(path) as archive:
+                results = {name: _mmap_member(path, archive, name) for name in RESULT_NAMES}
+            if any(value is None for value in results.values()):
+                results = None
+        if results is None:
+            results = {name: data[name] for name in RESULT_NAMES}
+    return results, meta
+
+
+def load_index(paths):
+    """多个结果文件的参数和求解信息，每个文件一行，不读取解本身"""
+    rows = []
+    for path in paths:
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data["meta"].item())
+        rows.append({"path": str(path), **meta["params"], **meta["info"]})
+    return pd.DataFrame(rows)
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from gurobiModel import build_model
+from modelParams import DEFAULT_PARAMS, initial_state
+from resultStore import result_path, save_results
+from warmStart import warm_start
+
+
+def solve_rolling(params=None, window=240, step=120, formulation="compact", policy=None, time_limit=None,
+                  verbose=False):
+    """
+    滚动时域求解长时窗：依次求解 [start, start + window] 的子问题，只保留完成时间不晚于 start + step 的任务，
+    把各车最后保留任务的完成时间、电量和换电站的空闲时间带入下一个窗口，最后一个窗口保留全部任务。
+    policy: 与 simulate 相同的 (high, low, swap_ready, alpha, dec)，给出时每个窗口都用该策略热启动
+    返回与整体求解相同格式的结果字典（T/s/x/E/z，每辆车一行）和各窗口的求解信息
+    """
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    I, H, T_run, T_swap, Delta = p["I"], p["H"], p["T_run"], p["T_swap"], p["Delta"]
+
+    T_first, E_first = (a.astype(np.int64) for a in initial_state(p))
+    bay_free = p["bay_free"]
+    rows = {name: [[0] for _ in range(I)] for name in ("T", "s", "x", "E")}
+    for i in range(I):
+        rows["T"][i][0], rows["E"][i][0] = T_first[i], E_first[i]
+
+    windows = []
+    start = p["ST"]
+    while True:
+        end = min(start + window, H)
+        final = end == H
+        commit_until = end if final else start + step
+        sub = {**p, "H": end, "T_first": T_first.copy(), "E_first": E_first.copy(), "bay_free": bay_free}
+
+        # 任务槽数由预处理按窗口确定
+        model, variables = build_model(sub, formulation, presolve_model=True)
+        J = variables["T"].shape[1]
+        model.setParam("OutputFlag", int(verbose))
+        if time_limit is not None:
+            model.setParam("TimeLimit", time_limit)
+        heuristic_obj = warm_start(variables, policy, sub) if policy is not None else None
+        model.optimize()
+        if model.SolCount == 0:
+            raise RuntimeError(f"窗口 [{start}, {end}] 没有找到可行解，状态码 {model.Status}")
+        T, s, x, E, z = (np.rint(variables[name].X).astype(np.int64) for name in ("T", "s", "x", "E", "z"))
+
+        # 保留 commit_until 之前完成的任务，以及通向这些任务的换电
+        num_committed = 0
+        for i in range(I):
+            for j in range(1, J):
+                if z[i, j] == 0 or T[i, j] > commit_until:
+                    break
+                rows["x"][i][-1], rows["s"][i][-1] = x[i, j - 1], s[i, j - 1]
+                if x[i, j - 1]:
+                    bay_free = max(bay_free, s[i, j - 1] + T_swap)
+                rows["T"][i].append(T[i, j])
+                rows["E"][i].append(E[i, j])
+                rows["x"][i].append(0)
+                rows["s"][i].append(0)
+                num_committed += 1
+            T_first[i], E_first[i] = rows["T"][i][-1], rows["E"][i][-1]
+
+        windows.append({
+            "start": start,
+            "end": end,
+            "J": J,
+            "status": model.Status,
+            "objective": model.ObjVal,
+            "bound": model.ObjBound,
+            "heuristic": heuristic_obj,
+            "committed_tasks": num_committed,
+            "runtime": model.Runtime,
+        })
+        model.dispose()
+        if final:
+            break
+        start += step
+
+    return stitch(rows, T_run, Delta), pd.DataFrame(windows)
+
+
+def stitch(rows, T_run, Delta):
+    """
+    把各车保留的任务补齐成 (I, J) 的结果字典，未执行的槽不换电，与 warmStart.fill_unexecuted 一样
+    按约束顺延：时间每槽加 T_run，电量每槽减 Delta（可能为负，与预处理放开的电量下界对应）
+    """
+    J = max(len(T_row) for T_row in rows["T"])
+    results = {name: [] for name in ("T", "s", "x", "E", "z")}
+    for i in range(len(rows["T"])):
+        n = len(rows["T"][i])
+        pad = J - n
+        results["T"].append(rows["T"][i] + [rows["T"][i][-1] + T_run * (k + 1) for k in range(pad)])
+        results["E"].append(rows["E"][i] + [rows["E"][i][-1] - Delta * (k + 1) for k in range(pad)])
+        results["s"].append(rows["s"][i] + [0] * pad)
+        results["x"].append(rows["x"][i] + [0] * pad)
+        results["z"].append([1] * n + [0] * pad)
+    return {name: [[int(v) for v in row] for row in value] for name, value in results.items()}
+
+
+if __name__ == "__main__":
+    params = {"I": 7, "H": 1440}
+    results, windows = solve_rolling(params, window=240, step=120, policy=(90, 35, 100, 0.9, 0.6), time_limit=60)
+    print(windows)
+    print(f"总有效作业时间：{DEFAULT_PARAMS['T_run'] * sum(map(sum, results['z']))} 分钟")
+
+    params = {**DEFAULT_PARAMS, **params, "J": len(results["T"][0])}
+    save_results(result_path(params), results, params, {"windows": windows.to_dict("list")})
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from gurobipy import GRB
+
+from gurobiModel import build_model
+from modelParams import DEFAULT_PARAMS, FORMULATIONS, presolve as presolve_params
+from resultStore import FORMAT_VERSION, extract_results, jsonable, load_results, save_results, solve_info
+from warmStart import warm_start
+
+
+def scenario_key(params, formulation="compact", presolve=True):
+    """
+    参数（补全默认值后）和模型形式的哈希，参数相同的情景共用一份缓存。
+    预处理时 J 由 presolve 确定，按实际的 J 计算，只有传入的 J 不同的情景共用缓存。
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    if presolve:
+        p["J"] = presolve_params(p)[0]
+    text = json.dumps({"params": jsonable(p), "formulation": formulation, "presolve": presolve}, sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def info_path(path):
+    """没有解的情景只缓存求解信息，存在同名的 .json 文件中"""
+    return os.path.splitext(path)[0] + ".json"
+
+
+def cached_info(path, time_limit):
+    """
+    缓存中可以直接使用的求解信息：已证明最优或不可行，或者当时的时间上限不少于本次；否则返回 None。
+    没有解的情景（不可行、到时间上限仍没有可行解）读取 info_path 中的求解信息。
+    """
+    if os.path.exists(path):
+        _, meta = load_results(path, mmap=False)
+    elif os.path.exists(info_path(path)):
+        with open(info_path(path)) as f:
+            meta = json.load(f)
+    else:
+        return None
+    info = meta["info"]
+    if info["status"] in (GRB.OPTIMAL, GRB.INFEASIBLE):
+        return info
+    if info["status"] != GRB.INPROGRESS and (info.get("time_limit") or 0) >= (time_limit or float("inf")):
+        return info
+    return None
+
+
+def solve_scenario(params, path, formulation="compact", presolve=True, threads=1, time_limit=None, policy=None):
+    """在子进程中求解一个情景并写入缓存，返回求解信息"""
+    model, variables = build_model(params, formulation, presolve)
+    model.setParam("OutputFlag", 0)
+    model.setParam("Threads", threads)
+    if time_limit is not None:
+        model.setParam("TimeLimit", time_limit)
+    heuristic_obj = warm_start(variables, policy, params) if policy is not None else None
+    model.optimize()
+
+    info = {**solve_info(model), "time_limit": time_limit, "threads": threads, "heuristic": heuristic_obj}
+    p = {**DEFAULT_PARAMS, **params, "J": variables["T"].shape[1]}
+    if model.SolCount > 0:
+        save_results(path, extract_results(model, variables), p, info)
+    else:
+        # 没有解时也记下求解信息，再次运行时不必重新求解
+        with open(info_path(path), "w") as f:
+            json.dump({"format_version": FORMAT_VERSION, "params": jsonable(p), "info": jsonable(info)}, f,
+                      ensure_ascii=False)
+    model.dispose()
+    return info
+
+
+def run_batch(scenarios, cache_dir="scenario_cache", formulation="compact", presolve=True, processes=None,
+              threads=None, time_limit=None, policy=(90, 35, 100, 0.9, 0.6)):
+    """
+    并行求解一组情景，scenarios 为参数字典的列表（只需给出与 DEFAULT_PARAMS 不同的参数）。
+    每个情景按 scenario_key 缓存在 cache_dir 中，再次运行时跳过已求解的情景。
+    processes 为同时求解的情景数，threads 为全部求解可用的线程总数（默认 CPU 数），平均分给各个求解。
+    返回每行一个情景的 DataFrame
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"未知的模型形式：{formulation}，可选 {FORMULATIONS}")
+    os.makedirs(cache_dir, exist_ok=True)
+    total_threads = threads or os.cpu_count()
+    processes = max(1, min(processes or total_threads, len(scenarios)))
+    threads_per_solve = max(1, total_threads // processes)
+
+    rows = [None] * len(scenarios)
+    todo = {}
+    for k, params in enumerate(scenarios):
+        key = scenario_key(params, formulation, presolve)
+        path = os.path.join(cache_dir, f"{key}.npz")
+        info = cached_info(path, time_limit)
+        if info is not None:
+            rows[k] = {**params, "key": key, "cached": True, **info}
+        else:
+            # 同一批中重复的情景只求解一次
+            todo.setdefault(key, (path, []))[1].append(k)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(solve_scenario, scenarios[ks[0]], path, formulation, presolve, threads_per_solve,
+                                   time_limit, policy): (key, ks)
+                   for key, (path, ks) in todo.items()}
+        for future in as_completed(futures):
+            key, ks = futures[future]
+            info = future.result()
+            for k in ks:
+                rows[k] = {**scenarios[k], "key": key, "cached": False, **info}
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # 容量规划：不同车辆数、换电时间和最低电量下的最大总运行时间
+    scenarios = [{"I": I, "H": 360, "T_swap": T_swap, "C_min": C_min}
+                 for I in (2, 3, 4) for T_swap in (6, 8, 10) for C_min in (20, 25)]
+    df = run_batch(scenarios, time_limit=600)
+    print(df[["I", "T_swap", "C_min", "cached", "status", "objective", "gap", "runtime"]])
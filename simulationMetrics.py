@@ -0,0 +1,88 @@
+import numpy as np
+
+
+class TraceMetrics:
+    """逐分钟完整记录，结果与原来的三个列表相同"""
+    wants_traces = True
+
+    def __init__(self):
+        self.total_time_record = []
+        self.queue_len = []
+        self.battery_charing = []
+
+    def record_span(self, start, stop, total_running_time, queue_length, charging_count):
+        """[start, stop) 这些分钟的指标都相同"""
+        n = stop - start
+        self.total_time_record.extend([total_running_time] * n)
+        self.queue_len.extend([queue_length] * n)
+        self.battery_charing.extend([charging_count] * n)
+
+    def result(self):
+        return self.total_time_record, self.queue_len, self.battery_charing
+
+
+class ArrayMetrics:
+    """预分配的 NumPy 数组，每 every 分钟记录一次（时间为 every 的整数倍的分钟）"""
+    wants_traces = True
+
+    def __init__(self, simulation_time, every=1):
+        self.every = every
+        size = -(-simulation_time // every)
+        self.total_time_record = np.zeros(size, dtype=np.int64)
+        self.queue_len = np.zeros(size, dtype=np.int32)
+        self.battery_charing = np.zeros(size, dtype=np.int32)
+
+    def record_span(self, start, stop, total_running_time, queue_length, charging_count):
+        i0, i1 = -(-start // self.every), -(-stop // self.every)
+        self.total_time_record[i0:i1] = total_running_time
+        self.queue_len[i0:i1] = queue_length
+        self.battery_charing[i0:i1] = charging_count
+
+    def times(self):
+        """各记录对应的分钟"""
+        return np.arange(len(self.queue_len)) * self.every
+
+    def result(self):
+        return self.total_time_record, self.queue_len, self.battery_charing
+
+
+class RingBufferMetrics:
+    """只保留最近 size 次记录的环形缓冲区，内存与仿真时长无关"""
+    wants_traces = True
+
+    def __init__(self, size, every=1):
+        self.size = size
+        self.every = every
+        self.count = 0  # 已记录的次数
+        self.total_time_record = np.zeros(size, dtype=np.int64)
+        self.queue_len = np.zeros(size, dtype=np.int32)
+        self.battery_charing = np.zeros(size, dtype=np.int32)
+
+    def record_span(self, start, stop, total_running_time, queue_length, charging_count):
+        k0, k1 = -(-start // self.every), -(-stop // self.every)
+        if k1 <= k0:
+            return
+        slots = np.arange(max(k0, k1 - self.size), k1) % self.size
+        self.total_time_record[slots] = total_running_time
+        self.queue_len[slots] = queue_length
+        self.battery_charing[slots] = charging_count
+        self.count = k1
+
+    def times(self):
+        """缓冲区中各记录对应的分钟，按时间先后排列"""
+        return np.arange(max(0, self.count - self.size), self.count) * self.every
+
+    def result(self):
+        order = np.arange(max(0, self.count - self.size), self.count) % self.size
+        return self.total_time_record[order], self.queue_len[order], self.battery_charing[order]
+
+
+class TotalsOnlyMetrics:
+    """只要总运行时间，不记录任何曲线，用于参数扫描"""
+    wants_traces = False
+
+    def record_span(self, start, stop, total_running_time, queue_length, charging_count):
+        pass
+
+    def result(self):
+        return None, None, None
@@ -1,7 +1,14 @@
+import bisect
+import functools
+import heapq
+import itertools
+from collections import OrderedDict
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+from simulationMetrics import TraceMetrics
+
 
 CHARGINGTIME = 8  # 换电时间
 TRIPTIME = 30  # 行程时间
@@ -10,10 +17,22 @@ SIMULATION_TIME = 360  # 仿真时间，单位分钟
 MAX_QUEUE_LENGTH = 1  # 最大排队长度
 
 
+@functools.lru_cache(maxsize=None)
+def charge_trajectory(charge, rate, capacity=100):
+    """从当前电量开始逐分钟充电直到充满的电量序列，与 charge_battery 的逐步累加结果完全一致"""
+    trajectory = [charge]
+    while charge < capacity:
+        charge = min(capacity, charge + rate * 1)
+        trajectory.append(charge)
+    return tuple(trajectory)
+
+
 class Battery:
     def __init__(self, capacity=100):
         self.capacity = capacity
-        self.charge = capacity  # 初始满电
+        self.charge = capacity  # 初始满电；在换电站充电时表示接入时的电量
+        self.plug_time = None  # 接入充电的时间，None 表示不在充电
+        self.trajectory = None  # 接入后逐分钟的电量
 
     def discharge(self, amount):
         self.charge -= amount
@@ -21,11 +40,53 @@ class Battery:
     def charge_battery(self, rate, time):
         self.charge = min(self.capacity, self.charge + rate * time)
 
+    def plug_in(self, rate, time):
+        """接入充电，只记录接入时间和接入时的电量，之后的电量由 charge_at 按需计算"""
+        self.plug_time = time
+        self.trajectory = charge_trajectory(self.charge, rate, self.capacity)
+
+    def unplug(self, time):
+        """拔下电池，把当前电量写回 charge"""
+        self.charge = self.charge_at(time)
+        self.plug_time = None
+        self.trajectory = None
+
+    def charge_at(self, time):
+        """time 时刻的电量"""
+        if self.plug_time is None:
+            return self.charge
+        return self.trajectory[min(time - self.plug_time, len(self.trajectory) - 1)]
+
+    @property
+    def full_time(self):
+        """充满的时间"""
+        return self.plug_time + len(self.trajectory) - 1
+
+    def ready_time(self, threshold):
+        """电量首次达到 threshold 的时间，永远达不到时返回 None"""
+        k = bisect.bisect_left(self.trajectory, threshold)
+        return self.plug_time + k if k < len(self.trajectory) else None
+
     def __lt__(self, other):
         """定义小于运算符，使 Battery 实例可以被 heapq 排序"""
         return self.charge < other.charge
 
 
+class PooledBattery:
+    """
+    换电站电池池中的一块电池，按换电站当前时刻的电量比较，电量多的排在堆顶。
+    所有电池充电速率相同，电量的先后顺序不会随时间改变，因此堆结构一直有效。
+    """
+    def __init__(self, battery, station):
+        self.battery = battery
+        self.station = station
+        self.in_pool = True
+
+    def __lt__(self, other):
+        time = self.station.time
+        return self.battery.charge_at(time) > other.battery.charge_at(time)
+
+
 class Vehicle:
     def __init__(self, vehicle_id, battery, high_battery_threshold, low_battery_threshold, alpha, dec):
         self.id = vehicle_id
@@ -35,28 +96,29 @@ class Vehicle:
         self.low_battery_threshold = low_battery_threshold
         self.state = "running"  # 运行、换电中、排队中、前往换电站
         self.wait_time = 0  # 记录等待时间
+        self.trip_time = TRIPTIME  # 当前行程的时长
         self.trip_end_time = 0  # 记录当前行程结束时间
         self.travel_end_time = 0  # 记录前往换电站的结束时间
         self.alpha = alpha
         self.dec = dec
 
-    def start_trip(self, current_time):
-        """开始行程，设置 30 分钟后结束"""
+    def start_trip(self, current_time, trip_time=TRIPTIME):
+        """开始行程，默认设置 30 分钟后结束"""
         if self.battery.charge >= self.low_battery_threshold:
-            self.trip_end_time = current_time + TRIPTIME
+            self.trip_time = trip_time
+            self.trip_end_time = current_time + trip_time
             self.state = "in_trip"
         else:
             assert False
 
-    def end_trip(self, current_time, swap_queue_length, max_length):
+    def end_trip(self, current_time, swap_queue_length, max_length, travel_time=10):
         """结束行程，判断是否需要去换电站"""
         self.battery.discharge(10)
-        self.running_time += TRIPTIME
+        self.running_time += self.trip_time
 
         if self.needs_swap(swap_queue_length, max_length):
             self.state = "traveling_to_station"
             # 如果换电站排队中有车辆，节约 10 分钟
-            travel_time = 10
             self.travel_end_time = current_time + travel_time
         else:
             self.state = "running"
@@ -78,65 +140,142 @@ class Vehicle:
             return score >= self.dec
 
 
+class VehicleQueue:
+    """先进先出的车辆队列，成员判断、删除、出队和长度都是 O(1)"""
+    def __init__(self):
+        self.entries = OrderedDict()  # 车辆 -> 入队时间
+
+    def append(self, vehicle, time=None):
+        self.entries[vehicle] = time
+
+    def remove(self, vehicle):
+        del self.entries[vehicle]
+
+    def peek(self):
+        """队首的 (入队时间, 车辆)"""
+        vehicle = next(iter(self.entries))
+        return self.entries[vehicle], vehicle
+
+    def popleft(self):
+        """队首出队，返回 (入队时间, 车辆)"""
+        vehicle, time = self.entries.popitem(last=False)
+        return time, vehicle
+
+    def __contains__(self, vehicle):
+        return vehicle in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+
 class BatterySwapStation:
     def __init__(self, num_batteries=10, charge_time=90):
         self.charge_rate = 100 / charge_time  # 充电速率
-        self.available_batteries = [Battery() for _ in range(num_batteries)]
-        self.swap_queue = []
-        self.traveling_to_station_queue = []
+        self.time = 0  # 充电时钟，电池电量都按这个时间计算
+        self.available_batteries = []  # PooledBattery 的堆，堆顶是电量最多的电池
+        self.charging_full_times = []  # 未充满电池的 (充满时间, 序号, PooledBattery)
+        self.num_charging = 0  # 未充满的电池数
+        self.serial = itertools.count()
+        self.swap_queue = VehicleQueue()  # 排队换电的车辆
+        self.traveling_to_station_queue = VehicleQueue()  # 前往换电站的车辆
         self.last_swap_end_time = 0  # 记录最近一次换电完成的时间
+        for _ in range(num_batteries):
+            self.add_to_charging(Battery())
 
-    # def add_to_charging(self, battery):
-    #     """添加电池到充电队列"""
-    #     heapq.heappush(self.charging_batteries, (battery.charge, battery))
     def add_to_charging(self, battery):
         """添加电池到充电队列"""
-        self.available_batteries.append(battery)
+        battery.plug_in(self.charge_rate, self.time)
+        pooled = PooledBattery(battery, self)
+        heapq.heappush(self.available_batteries, pooled)
+        if battery.full_time > self.time:
+            heapq.heappush(self.charging_full_times, (battery.full_time, next(self.serial), pooled))
+            self.num_charging += 1
+
+    def queue_length(self):
+        """排队和前往换电站的车辆总数，用于 Vehicle.needs_swap"""
+        return len(self.swap_queue) + len(self.traveling_to_station_queue)
+
+    def take_fullest(self):
+        """取出电量最多的电池"""
+        self.charging_count()
+        pooled = heapq.heappop(self.available_batteries)
+        pooled.in_pool = False
+        if pooled.battery.full_time > self.time:
+            self.num_charging -= 1
+        pooled.battery.unplug(self.time)
+        return pooled.battery
+
+    def fullest_charge(self):
+        """当前电量最多的电池的电量，没有电池时返回 None"""
+        if not self.available_batteries:
+            return None
+        return self.available_batteries[0].battery.charge_at(self.time)
+
+    def ready_time(self, swap_ready_threshold):
+        """最早有电池达到 swap_ready_threshold 的时间，电池池不变时有效"""
+        if not self.available_batteries:
+            return None
+        return self.available_batteries[0].battery.ready_time(swap_ready_threshold)
+
+    def next_full_time(self):
+        """下一块电池充满的时间（可能是已被取走的电池，只用于划分记录区间）"""
+        if not self.charging_full_times:
+            return None
+        return self.charging_full_times[0][0]
 
     def charge_batteries(self, time_step=1):
-        """每个时间步，所有电池都均匀充电"""
-        for i in range(len(self.available_batteries)):
-            battery = self.available_batteries[i]
-            battery.charge_battery(self.charge_rate, time_step)
-
-    def swap_battery(self, vehicle, swap_ready_threshold, current_time):
-        """处理换电，确保两次换电至少相差 8 分钟，并随机选择一块符合条件的电池"""
+        """推进充电时钟，电量由各电池按接入时间计算，无需逐块充电"""
+        self.time += time_step
+
+    def charging_count(self):
+        """当前未充满的电池数"""
+        while self.charging_full_times and self.charging_full_times[0][0] <= self.time:
+            _, _, pooled = heapq.heappop(self.charging_full_times)
+            if pooled.in_pool:
+                self.num_charging -= 1
+        return self.num_charging
+
+    def swap_battery(self, vehicle, swap_ready_threshold, current_time, swap_time=CHARGINGTIME):
+        """处理换电，确保两次换电至少相差 8 分钟，并选择电量最多的一块符合条件的电池"""
         # 确保前一个换电完成至少 8 分钟后才允许换电
         if current_time < self.last_swap_end_time:
             return False  # 不能换电，等待时间未满足
 
-        # 选择所有符合 swap_ready_threshold 的电池
-        eligible_batteries = [battery for battery in self.available_batteries if
-                              battery.charge >= swap_ready_threshold]
-
-        if eligible_batteries:
-            # 随机选择一块电池
-            # new_battery = random.choice(eligible_batteries)
-            # 选电量最多的
-            tt = sorted([(b.charge, b) for b in eligible_batteries], reverse=True, key=lambda x: x[0])
-            new_battery = tt[0][1]
-            self.available_batteries.remove(new_battery)
+        # 堆顶是电量最多的电池，只要它满足 swap_ready_threshold 就可以换电
+        fullest_charge = self.fullest_charge()
+        if fullest_charge is not None and fullest_charge >= swap_ready_threshold:
+            new_battery = self.take_fullest()
 
             # 车辆换下的电池入充电队列
             self.add_to_charging(vehicle.battery)
             vehicle.battery = new_battery
 
             # 记录换电完成时间
-            self.last_swap_end_time = current_time + CHARGINGTIME  # 8 分钟换电
+            self.last_swap_end_time = current_time + swap_time  # 默认 8 分钟换电
             return True
 
 
-def simulate(high_battery_threshold, low_battery_threshold, swap_ready_threshold, alpha, dec):
-    vehicles = [Vehicle(i, Battery(), high_battery_threshold, low_battery_threshold, alpha, dec) for i in range(NUM_VEHICLES)]
-    station = BatterySwapStation()
-    total_time_record = []
-    queue_len = []
-    battery_charing = []
+def simulate(high_battery_threshold, low_battery_threshold, swap_ready_threshold, alpha, dec,
+             num_vehicles=None, simulation_time=None, num_batteries=10, metrics=None, trace=None):
+    """
+    逐分钟仿真。
+    metrics: 指标记录方式（见 simulationMetrics），默认逐分钟记录完整曲线
+    trace: 可选的 eventTrace.EventTrace，记录每次状态变化和换电
+    """
+    num_vehicles = NUM_VEHICLES if num_vehicles is None else num_vehicles
+    simulation_time = SIMULATION_TIME if simulation_time is None else simulation_time
+    vehicles = [Vehicle(i, Battery(), high_battery_threshold, low_battery_threshold, alpha, dec) for i in range(num_vehicles)]
+    station = BatterySwapStation(num_batteries)
+    metrics = TraceMetrics() if metrics is None else metrics
+    total_running_time = 0  # 增量维护的总运行时间
 
     time = 0
     max_length = MAX_QUEUE_LENGTH
 
-    while time < SIMULATION_TIME:
+    while time < simulation_time:
 
         # if time < 120:
         #     for i in range(len(vehicles)):
@@ -153,87 +292,215 @@ def simulate(high_battery_threshold, low_battery_threshold, swap_ready_threshold
         for vehicle in vehicles:
             if vehicle.state == "running":
                 vehicle.start_trip(time)
+                if trace is not None:
+                    trace.record(time, vehicle.id, "running", "in_trip", vehicle.battery.charge, len(station.swap_queue))
 
             elif vehicle.state == "in_trip":
                 if time >= vehicle.trip_end_time:
-                    vehicle.end_trip(time, len(station.swap_queue)+len(station.traveling_to_station_queue), max_length)
+                    vehicle.end_trip(time, station.queue_length(), max_length)
+                    total_running_time += vehicle.trip_time
                     if vehicle.state == "traveling_to_station" and vehicle not in station.traveling_to_station_queue:
-                        station.traveling_to_station_queue.append(vehicle)
+                        station.traveling_to_station_queue.append(vehicle, time)
+                    if trace is not None:
+                        trace.record(time, vehicle.id, "in_trip", vehicle.state, vehicle.battery.charge, len(station.swap_queue))
 
             elif vehicle.state == "traveling_to_station":
                 if time >= vehicle.travel_end_time:
                     vehicle.state = "waiting"
                     station.traveling_to_station_queue.remove(vehicle)
-                    station.swap_queue.append((time, vehicle))
+                    station.swap_queue.append(vehicle, time)
+                    if trace is not None:
+                        trace.record(time, vehicle.id, "traveling_to_station", "waiting", vehicle.battery.charge,
+                                     len(station.swap_queue))
 
             elif vehicle.state == "waiting":
-                if station.swap_queue and station.swap_queue[0][1] == vehicle:
+                if station.swap_queue and station.swap_queue.peek()[1] == vehicle:
+                    old_battery = vehicle.battery
                     if station.swap_battery(vehicle, swap_ready_threshold, time):
-                        station.swap_queue.pop(0)
+                        station.swap_queue.popleft()
                         vehicle.state = "swapping"
                         vehicle.wait_end_time = time + 10 + CHARGINGTIME  # 8min 换电 + 10min 前往起点
+                        if trace is not None:
+                            trace.record_swap(time, vehicle.id, vehicle.battery.charge, old_battery.charge,
+                                              len(station.swap_queue))
+                            trace.record(time, vehicle.id, "waiting", "swapping", vehicle.battery.charge,
+                                         len(station.swap_queue))
 
             elif vehicle.state == "swapping":
                 if time >= vehicle.wait_end_time:
                     vehicle.state = "running"
+                    if trace is not None:
+                        trace.record(time, vehicle.id, "swapping", "running", vehicle.battery.charge, len(station.swap_queue))
 
         # 充电站电池充电
         station.charge_batteries()
+        if metrics.wants_traces:
+            metrics.record_span(time, time + 1, total_running_time, len(station.swap_queue), station.charging_count())
         time += 1  # 时间推进 1 分钟
-        total_time_record.append(sum([v.running_time for v in vehicles]))  # 运行时间占比
-        queue_len.append(len(station.swap_queue))
-        battery_charing.append(len([val for val in station.available_batteries if val.charge < 100]))
-
-    return sum([v.running_time for v in vehicles]), total_time_record, queue_len, battery_charing
-
-
-# 运行仿真
-swap_ready_threshold = 100  # 充电站电池最少要充到 100 才能用
-
-# aaa = []
-# for low_threshold in range(35, swap_ready_threshold + 5, 5):
-#     total_runtime, _a, __b, ___c = simulate(low_threshold, swap_ready_threshold)
-#     aaa.append(total_runtime)
-#     print(f"{low_threshold} - 总运行时间：", total_runtime, "分钟")
-#     print(f"{low_threshold} - 占比：", total_runtime / (SIMULATION_TIME * NUM_VEHICLES) * 100)
-#     print(aaa)
-
-# total_runtime, queue, battery = simulate_24h(35, swap_ready_threshold)
-
-high_threshold = 90
-low_threshold = 35
-max_res = -np.inf
-
-# # form it as a matrix
-# res_arr = [[0 for _ in range(21)] for __ in range(21)]
-# for i in range(0, 21, 1):
-#     for j in range(0, 21, 1):
-#         alpha = i / 20
-#         dec = j / 20
-#         total_runtime, _a, __b, ___c = simulate(high_threshold, low_threshold, swap_ready_threshold, alpha, dec)
-#         print(f"ALPHA={alpha}, DEC={dec} - 总运行时间：", total_runtime, "分钟")
-#         print(f"ALPHA={alpha}, DEC={dec} - 占比：", total_runtime / (SIMULATION_TIME * NUM_VEHICLES) * 100)
-#         res_arr[i][j] = total_runtime
-#         if total_runtime > max_res:
-#             max_res = total_runtime
-#             best_alpha = [alpha]
-#             best_dec = [dec]
-#         elif total_runtime == max_res:
-#             best_alpha.append(alpha)
-#             best_dec.append(dec)
-#
-# # transform into dataframe
-# df = pd.DataFrame(res_arr)
-
-
-alpha = 0.9
-dec = 0.6
-total_runtime, _a, __b, ___c = simulate(high_threshold, low_threshold, swap_ready_threshold, alpha, dec)
-print(f"{low_threshold} - 总运行时间：", total_runtime, "分钟")
-print(f"{low_threshold} - 占比：", total_runtime / (SIMULATION_TIME * NUM_VEHICLES) * 100)
-# draw pics
-plt.plot(__b, label="queue length")
-plt.plot(___c, label="charging battery")
-plt.xlabel("Time (minutes)")
-plt.legend()
-plt.show()
+
+    return total_running_time, *metrics.result()
+
+
+def simulate_event_driven(high_battery_threshold, low_battery_threshold, swap_ready_threshold, alpha, dec,
+                          num_vehicles=None, simulation_time=None, num_batteries=10, durations=None, metrics=None,
+                          trace=None):
+    """
+    事件驱动仿真：只在行程结束、到站、换电开始和换电结束时处理车辆，结果与 simulate 逐分钟仿真一致。
+    durations: 可选的随机时长来源（见 monteCarlo.StochasticDurations），为 None 时使用固定时长
+    metrics: 指标记录方式（见 simulationMetrics），默认逐分钟记录完整曲线
+    trace: 可选的 eventTrace.EventTrace，记录每次状态变化和换电
+    """
+    num_vehicles = NUM_VEHICLES if num_vehicles is None else num_vehicles
+    simulation_time = SIMULATION_TIME if simulation_time is None else simulation_time
+    vehicles = [Vehicle(i, Battery(), high_battery_threshold, low_battery_threshold, alpha, dec) for i in range(num_vehicles)]
+    station = BatterySwapStation(num_batteries)
+    max_length = MAX_QUEUE_LENGTH
+
+    metrics = TraceMetrics() if metrics is None else metrics
+    total_running_time = 0
+    recorded = 0  # 已记录到的分钟
+
+    def record_until(until):
+        """两次事件之间只有充电中的电池数会变化，按其变化点分段记录"""
+        nonlocal recorded
+        while recorded < until:
+            # 每分钟记录时电池已充过一次电
+            station.charge_batteries(recorded + 1 - station.time)
+            charging_count = station.charging_count()
+            next_full_time = station.next_full_time()
+            stop = until if next_full_time is None else min(until, next_full_time - 1)
+            metrics.record_span(recorded, stop, total_running_time, len(station.swap_queue), charging_count)
+            recorded = stop
+
+    def schedule_head():
+        if station.swap_queue:
+            arrive_time, head = station.swap_queue.peek()
+            # 队首等待期间电池池不变，最早换电时间可以直接算出
+            ready_time = station.ready_time(swap_ready_threshold)
+            if ready_time is not None:
+                swap_time = max(arrive_time + 1, station.last_swap_end_time, ready_time)
+                heapq.heappush(events, (swap_time, head.id))
+
+    # 事件按 (时间, 车辆编号) 排序，与逐分钟循环中车辆的处理顺序一致
+    events = [(0, vehicle.id) for vehicle in vehicles]
+    heapq.heapify(events)
+
+    while events and events[0][0] < simulation_time:
+        time, vehicle_id = heapq.heappop(events)
+        vehicle = vehicles[vehicle_id]
+        if metrics.wants_traces:
+            record_until(time)
+        station.charge_batteries(time - station.time)
+
+        if vehicle.state == "running":
+            if durations is None:
+                vehicle.start_trip(time)
+            else:
+                vehicle.start_trip(time, durations.trip_time(vehicle_id))
+            if trace is not None:
+                trace.record(time, vehicle_id, "running", "in_trip", vehicle.battery.charge, len(station.swap_queue))
+            heapq.heappush(events, (vehicle.trip_end_time, vehicle_id))
+
+        elif vehicle.state == "in_trip":
+            if durations is None:
+                vehicle.end_trip(time, station.queue_length(), max_length)
+            else:
+                vehicle.end_trip(time, station.queue_length(), max_length, durations.travel_time(vehicle_id))
+            total_running_time += vehicle.trip_time
+            if trace is not None:
+                trace.record(time, vehicle_id, "in_trip", vehicle.state, vehicle.battery.charge, len(station.swap_queue))
+            if vehicle.state == "traveling_to_station":
+                station.traveling_to_station_queue.append(vehicle, time)
+                heapq.heappush(events, (vehicle.travel_end_time, vehicle_id))
+            else:
+                heapq.heappush(events, (time + 1, vehicle_id))
+
+        elif vehicle.state == "traveling_to_station":
+            vehicle.state = "waiting"
+            station.traveling_to_station_queue.remove(vehicle)
+            station.swap_queue.append(vehicle, time)
+            if trace is not None:
+                trace.record(time, vehicle_id, "traveling_to_station", "waiting", vehicle.battery.charge,
+                             len(station.swap_queue))
+            if len(station.swap_queue) == 1:
+                schedule_head()
+
+        elif vehicle.state == "waiting":
+            # 只有队首车辆会被调度到这里，且此时换电位空闲、有满足条件的电池
+            swap_time = CHARGINGTIME if durations is None else durations.swap_time(vehicle_id)
+            back_time = 10 if durations is None else durations.back_time(vehicle_id)
+            old_battery = vehicle.battery
+            station.swap_battery(vehicle, swap_ready_threshold, time, swap_time)
+
+            station.swap_queue.popleft()
+            vehicle.state = "swapping"
+            vehicle.wait_end_time = time + back_time + swap_time  # 8min 换电 + 10min 前往起点
+            if trace is not None:
+                trace.record_swap(time, vehicle_id, vehicle.battery.charge, old_battery.charge, len(station.swap_queue))
+                trace.record(time, vehicle_id, "waiting", "swapping", vehicle.battery.charge, len(station.swap_queue))
+            heapq.heappush(events, (vehicle.wait_end_time, vehicle_id))
+            schedule_head()
+
+        elif vehicle.state == "swapping":
+            vehicle.state = "running"
+            if trace is not None:
+                trace.record(time, vehicle_id, "swapping", "running", vehicle.battery.charge, len(station.swap_queue))
+            heapq.heappush(events, (time + 1, vehicle_id))
+
+    if metrics.wants_traces:
+        record_until(simulation_time)
+
+    return total_running_time, *metrics.result()
+
+
+if __name__ == "__main__":
+    # 运行仿真
+    swap_ready_threshold = 100  # 充电站电池最少要充到 100 才能用
+
+    # aaa = []
+    # for low_threshold in range(35, swap_ready_threshold + 5, 5):
+    #     total_runtime, _a, __b, ___c = simulate(low_threshold, swap_ready_threshold)
+    #     aaa.append(total_runtime)
+    #     print(f"{low_threshold} - 总运行时间：", total_runtime, "分钟")
+    #     print(f"{low_threshold} - 占比：", total_runtime / (SIMULATION_TIME * NUM_VEHICLES) * 100)
+    #     print(aaa)
+
+    # total_runtime, queue, battery = simulate_24h(35, swap_ready_threshold)
+
+    high_threshold = 90
+    low_threshold = 35
+    max_res = -np.inf
+
+    # # form it as a matrix
+    # res_arr = [[0 for _ in range(21)] for __ in range(21)]
+    # for i in range(0, 21, 1):
+    #     for j in range(0, 21, 1):
+    #         alpha = i / 20
+    #         dec = j / 20
+    #         total_runtime, _a, __b, ___c = simulate(high_threshold, low_threshold, swap_ready_threshold, alpha, dec)
+    #         print(f"ALPHA={alpha}, DEC={dec} - 总运行时间：", total_runtime, "分钟")
+    #         print(f"ALPHA={alpha}, DEC={dec} - 占比：", total_runtime / (SIMULATION_TIME * NUM_VEHICLES) * 100)
+    #         res_arr[i][j] = total_runtime
+    #         if total_runtime > max_res:
+    #             max_res = total_runtime
+    #             best_alpha = [alpha]
+    #             best_dec = [dec]
+    #         elif total_runtime == max_res:
+    #             best_alpha.append(alpha)
+    #             best_dec.append(dec)
+    #
+    # # transform into dataframe
+    # df = pd.DataFrame(res_arr)
+
+
+    alpha = 0.9
+    dec = 0.6
+    total_runtime, _a, __b, ___c = simulate(high_threshold, low_threshold, swap_ready_threshold, alpha, dec)
+    print(f"{low_threshold} - 总运行时间：", total_runtime, "分钟")
+    print(f"{low_threshold} - 占比：", total_runtime / (SIMULATION_TIME * NUM_VEHICLES) * 100)
+    # draw pics
+    plt.plot(__b, label="queue length")
+    plt.plot(___c, label="charging battery")
+    plt.xlabel("Time (minutes)")
+    plt.legend()
+    plt.show()
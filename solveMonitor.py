@@ -0,0 +1,105 @@
+import csv
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from gurobipy import GRB
+
+from resultStore import RESULT_NAMES, save_results
+
+HISTORY_COLUMNS = ["runtime", "event", "incumbent", "bound", "gap", "nodes"]
+
+
+def mip_gap(incumbent, bound):
+    """与 Gurobi 相同的相对 gap，没有可行解或界时为 None"""
+    if incumbent is None or abs(incumbent) >= GRB.INFINITY or abs(bound) >= GRB.INFINITY:
+        return None
+    if incumbent == 0:
+        return 0.0 if bound == 0 else None
+    return abs(bound - incumbent) / abs(incumbent)
+
+
+class SolveMonitor:
+    """
+    model.optimize 的回调。每找到更好的可行解就按结果文件格式写入 path（先写临时文件再替换，
+    中途被杀掉也能留下完整的最好解），同时记录收敛过程：可行解事件和每隔 interval 秒的进度
+    （用时、目标值、界、gap、节点数），给出 log_path 时逐行追加到 CSV。
+    """
+    def __init__(self, variables, path, params=None, log_path=None, interval=5.0):
+        self.variables = variables
+        self.path = path
+        self.params = params
+        self.log_path = log_path
+        self.interval = interval
+        self.rows = []
+        self.best = None
+        self.last_progress = -np.inf
+        self.log_file = None
+        if log_path is not None:
+            self.log_file = open(log_path, "w", newline="")
+            self.writer = csv.writer(self.log_file)
+            self.writer.writerow(HISTORY_COLUMNS)
+            self.log_file.flush()
+
+    def __call__(self, model, where):
+        if where == GRB.Callback.MIPSOL:
+            incumbent = model.cbGet(GRB.Callback.MIPSOL_OBJ)
+            bound = model.cbGet(GRB.Callback.MIPSOL_OBJBND)
+            runtime = model.cbGet(GRB.Callback.RUNTIME)
+            nodes = model.cbGet(GRB.Callback.MIPSOL_NODCNT)
+            # 回调中的新解不一定比当前最好解好
+            if self.best is None or incumbent > self.best:
+                self.best = incumbent
+                self.checkpoint(model, incumbent, bound, runtime)
+            self.record(runtime, "incumbent", incumbent, bound, nodes)
+        elif where == GRB.Callback.MIP:
+            runtime = model.cbGet(GRB.Callback.RUNTIME)
+            if runtime - self.last_progress >= self.interval:
+                self.last_progress = runtime
+                incumbent = model.cbGet(GRB.Callback.MIP_OBJBST)
+                self.record(runtime, "progress", incumbent if abs(incumbent) < GRB.INFINITY else None,
+                            model.cbGet(GRB.Callback.MIP_OBJBND), model.cbGet(GRB.Callback.MIP_NODCNT))
+
+    def checkpoint(self, model, incumbent, bound, runtime):
+        results = {name: np.rint(model.cbGetSolution(self.variables[name])).astype(np.int64) for name in RESULT_NAMES}
+        info = {
+            "status": GRB.INPROGRESS,
+            "objective": incumbent,
+            "bound": bound if abs(bound) < GRB.INFINITY else None,
+            "gap": mip_gap(incumbent, bound),
+            "runtime": runtime,
+            "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            save_results(f, results, self.params, info)
+        os.replace(tmp_path, self.path)
+
+    def record(self, runtime, event, incumbent, bound, nodes):
+        bound = bound if abs(bound) < GRB.INFINITY else None
+        row = [runtime, event, incumbent, bound, mip_gap(incumbent, bound if bound is not None else GRB.INFINITY),
+               nodes]
+        self.rows.append(row)
+        if self.log_file is not None:
+            self.writer.writerow(row)
+            self.log_file.flush()
+
+    def close(self):
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+    def history(self):
+        """收敛过程，每行一个事件"""
+        return pd.DataFrame(self.rows, columns=HISTORY_COLUMNS)
+
+
+def load_history(log_path):
+    return pd.read_csv(log_path)
+
+
+def time_to_gap(history, gap=0.01):
+    """gap 第一次不超过给定值的用时，没有达到时为 None，用于按算例规模选择时间上限"""
+    reached = history[history["gap"].notna() & (history["gap"] <= gap)]
+    return None if reached.empty else float(reached["runtime"].iloc[0])
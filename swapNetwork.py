@@ -0,0 +1,168 @@
+import copy
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from smartCharging import (CHARGINGTIME, NUM_VEHICLES, SIMULATION_TIME, MAX_QUEUE_LENGTH,
+                           Battery, BatterySwapStation, Vehicle)
+
+
+class NetworkStation(BatterySwapStation):
+    """多换电位的换电站，排队和在途车辆数都是 O(1) 获取，选站时不需要扫描队列"""
+    def __init__(self, station_id, num_bays=1, num_batteries=10, charge_time=90, max_queue_length=MAX_QUEUE_LENGTH):
+        super().__init__(num_batteries, charge_time)
+        self.id = station_id
+        self.num_bays = num_bays
+        self.max_queue_length = max_queue_length
+        self.bay_free_times = [0] * num_bays  # 各换电位空闲的时间（最小堆）
+
+        # 统计
+        self.num_swaps = 0
+        self.total_wait_time = 0
+        self.max_queue = 0
+        self.busy_time = 0
+
+    def expected_wait(self):
+        """按当前排队和在途车辆数估计的排队时间"""
+        return self.queue_length() / self.num_bays * CHARGINGTIME
+
+    def arrive(self, vehicle, time):
+        self.traveling_to_station_queue.remove(vehicle)
+        self.swap_queue.append(vehicle, time)
+        self.max_queue = max(self.max_queue, len(self.swap_queue))
+
+    def head_swap_time(self, swap_ready_threshold):
+        """队首车辆最早可以换电的时间，没有车辆排队或永远没有可用电池时返回 None"""
+        if not self.swap_queue:
+            return None
+        ready_time = self.ready_time(swap_ready_threshold)
+        if ready_time is None:
+            return None
+        arrive_time = self.swap_queue.peek()[0]
+        return max(arrive_time + 1, self.bay_free_times[0], ready_time)
+
+    def start_swap(self, time):
+        """队首车辆开始换电，返回该车辆"""
+        self.charge_batteries(time - self.time)
+        arrive_time, vehicle = self.swap_queue.popleft()
+        new_battery = self.take_fullest()
+        self.add_to_charging(vehicle.battery)
+        vehicle.battery = new_battery
+        heapq.heapreplace(self.bay_free_times, time + CHARGINGTIME)
+
+        self.num_swaps += 1
+        self.total_wait_time += time - arrive_time
+        self.busy_time += CHARGINGTIME
+        return vehicle
+
+
+def choose_station(stations, travel_times):
+    """选择 行驶时间 + 预计排队时间 最短的换电站"""
+    best, best_cost = None, np.inf
+    for station, travel_time in zip(stations, travel_times):
+        cost = travel_time + station.expected_wait()
+        if cost < best_cost:
+            best, best_cost = station, cost
+    return best
+
+
+def simulate_network(high_battery_threshold, low_battery_threshold, swap_ready_threshold, alpha, dec,
+                     stations, travel_times, num_vehicles=None, simulation_time=None):
+    """
+    多站点换电网络的事件驱动仿真。
+    stations: NetworkStation 列表，id 与 travel_times 的列对应；仿真在副本上进行，传入的站点不会被修改，
+    同一组站点可以重复用于多次仿真或策略对比
+    travel_times: (区域数, 站点数) 的行驶时间矩阵，车辆 i 属于区域 i % 区域数，换电后返回原区域
+    返回总运行时间和各站点统计
+    """
+    num_vehicles = NUM_VEHICLES if num_vehicles is None else num_vehicles
+    simulation_time = SIMULATION_TIME if simulation_time is None else simulation_time
+    stations = copy.deepcopy(stations)
+    travel_times = np.asarray(travel_times)
+    zone_travel_times = [row.tolist() for row in travel_times]
+    vehicles = [Vehicle(i, Battery(), high_battery_threshold, low_battery_threshold, alpha, dec) for i in range(num_vehicles)]
+    for vehicle in vehicles:
+        vehicle.zone = vehicle.id % len(zone_travel_times)
+        vehicle.station = None
+
+    def schedule_head(station):
+        swap_time = station.head_swap_time(swap_ready_threshold)
+        if swap_time is not None:
+            heapq.heappush(events, (swap_time, station.swap_queue.peek()[1].id))
+
+    # 事件按 (时间, 车辆编号) 排序
+    events = [(0, vehicle.id) for vehicle in vehicles]
+    heapq.heapify(events)
+
+    while events and events[0][0] < simulation_time:
+        time, vehicle_id = heapq.heappop(events)
+        vehicle = vehicles[vehicle_id]
+
+        if vehicle.state == "running":
+            vehicle.start_trip(time)
+            heapq.heappush(events, (vehicle.trip_end_time, vehicle_id))
+
+        elif vehicle.state == "in_trip":
+            vehicle.battery.discharge(10)
+            vehicle.running_time += vehicle.trip_time
+            station = choose_station(stations, zone_travel_times[vehicle.zone])
+            if vehicle.needs_swap(station.queue_length(), station.max_queue_length):
+                vehicle.state = "traveling_to_station"
+                vehicle.station = station
+                station.traveling_to_station_queue.append(vehicle, time)
+                vehicle.travel_end_time = time + zone_travel_times[vehicle.zone][station.id]
+                heapq.heappush(events, (vehicle.travel_end_time, vehicle_id))
+            else:
+                vehicle.state = "running"
+                heapq.heappush(events, (time + 1, vehicle_id))
+
+        elif vehicle.state == "traveling_to_station":
+            vehicle.state = "waiting"
+            vehicle.station.arrive(vehicle, time)
+            if len(vehicle.station.swap_queue) == 1:
+                schedule_head(vehicle.station)
+
+        elif vehicle.state == "waiting":
+            # 只有队首车辆会被调度到这里，且此时有空闲换电位和满足条件的电池
+            station = vehicle.station
+            station.start_swap(time)
+            vehicle.state = "swapping"
+            vehicle.wait_end_time = time + CHARGINGTIME + zone_travel_times[vehicle.zone][station.id]  # 换电 + 返回
+            heapq.heappush(events, (vehicle.wait_end_time, vehicle_id))
+            schedule_head(station)
+
+        elif vehicle.state == "swapping":
+            vehicle.state = "running"
+            vehicle.station = None
+            heapq.heappush(events, (time + 1, vehicle_id))
+
+    station_stats = pd.DataFrame({
+        "station": [station.id for station in stations],
+        "num_bays": [station.num_bays for station in stations],
+        "num_swaps": [station.num_swaps for station in stations],
+        "mean_wait": [station.total_wait_time / station.num_swaps if station.num_swaps else 0.0 for station in stations],
+        "max_queue": [station.max_queue for station in stations],
+        "bay_utilization": [station.busy_time / (station.num_bays * simulation_time) for station in stations],
+    })
+    return sum([v.running_time for v in vehicles]), station_stats
+
+
+if __name__ == "__main__":
+    # 3 个换电站、6 个区域的示例网络
+    stations = [NetworkStation(0, num_bays=2, num_batteries=30),
+                NetworkStation(1, num_bays=1, num_batteries=15),
+                NetworkStation(2, num_bays=3, num_batteries=40)]
+    travel_times = [[10, 15, 25],
+                    [12, 10, 20],
+                    [20, 10, 12],
+                    [25, 18, 10],
+                    [15, 20, 15],
+                    [10, 25, 20]]
+    num_vehicles = 120
+    simulation_time = 24 * 60
+    total_runtime, station_stats = simulate_network(90, 35, 100, 0.9, 0.6, stations, travel_times,
+                                                    num_vehicles, simulation_time)
+    print("总运行时间：", total_runtime, "分钟")
+    print("占比：", total_runtime / (simulation_time * num_vehicles) * 100)
+    print(station_stats)
@@ -0,0 +1,175 @@
+import numpy as np
+
+from eventTrace import STATE_CHANGE, STATE_CODES, STATES
+from modelParams import DEFAULT_PARAMS, initial_state
+from smartCharging import CHARGINGTIME
+
+# MIP 结果与仿真记录统一使用 eventTrace 的状态编码：
+# in_trip 为执行任务，waiting / swapping 为排队和换电；MIP 中往返换电站的 T_trip 记为 traveling_to_station，
+# 任务之间的空闲（第一个任务之前、最后一个任务之后）记为 running
+RUNNING, IN_TRIP, TRAVELING, WAITING, SWAPPING = (STATE_CODES[state] for state in STATES)
+
+
+def paint(vehicle, start, stop, value, shape, default=0):
+    """
+    把区间 [start, stop) 上的取值画到形状 (I, H) 的矩阵上（同一车辆的区间互不重叠），其余为 default。
+    用差分数组一次完成：区间起点加、终点减，再按行累加。
+    """
+    I, H = shape
+    start = np.clip(start, 0, H)
+    stop = np.clip(stop, 0, H)
+    delta = np.asarray(value) - default
+    diff = np.zeros((I, H + 1), dtype=np.result_type(delta, np.int64))
+    np.add.at(diff, (vehicle, start), delta)
+    np.add.at(diff, (vehicle, stop), -delta)
+    return np.cumsum(diff[:, :H], axis=1) + default
+
+
+def step_fill(vehicle, time, value, shape, initial):
+    """
+    阶梯函数：每个事件之后取事件的值直到同一车辆的下一个事件，第一个事件之前取 initial[i]。
+    同一时刻有多个事件时取排在后面的。
+    """
+    I, H = shape
+    value = np.asarray(value, dtype=float)
+    keep = (time >= 0) & (time < H)
+    order = np.flatnonzero(keep)
+    last = np.full((I, H), -1)
+    np.maximum.at(last, (vehicle[order], time[order]), order)
+    last = np.maximum.accumulate(last, axis=1)
+    return np.where(last >= 0, value[last], np.asarray(initial, dtype=float)[:, None])
+
+
+def count_intervals(start, stop, H):
+    """每分钟处在区间 [start, stop) 内的区间个数（区间裁剪到 [0, H)）"""
+    start = np.clip(start, 0, H)
+    stop = np.clip(stop, 0, H)
+    keep = start < stop
+    diff = np.zeros(H + 1, dtype=np.int64)
+    np.add.at(diff, start[keep], 1)
+    np.add.at(diff, stop[keep], -1)
+    return np.cumsum(diff[:H])
+
+
+def make_timeline(state, soc, in_system):
+    """
+    state / soc 为 (I, H) 的矩阵；waiting 为每分钟处于排队等待状态的车辆数，
+    in_system 为每分钟已决定换电、换电还没有结束的车辆数（前往、排队和正在换电）
+    """
+    return {"state": state.astype(np.int8), "soc": soc, "waiting": (state == WAITING).sum(axis=0),
+            "in_system": in_system}
+
+
+def timeline_from_results(results, params=None):
+    """
+    MIP 结果（T/s/x/E/z）的逐分钟状态、电量和排队车辆数：
+    任务 j 在 [T[j] - T_run, T[j]) 执行，换电槽依次为等待 [T[j], s)、换电 [s, s + T_swap)、往返 T_trip；
+    电量在任务结束时变为 E[j]，换电结束时变为 C_swap。
+    in_system 与原 gurobiVisualization 的排队长度相同：x[j] = 1 的槽从 T[j] + 1 到 s[j] + T_swap 计入。
+    """
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    H, T_run, T_swap, T_trip = p["H"], p["T_run"], p["T_swap"], p["T_trip"]
+    T, s, x, E, z = (np.asarray(results[name]).astype(np.int64) for name in ("T", "s", "x", "E", "z"))
+    I = len(T)
+
+    trip_v, trip_j = np.nonzero(z > 0)
+    swap_v, swap_j = np.nonzero((z > 0) & (x > 0))
+    swap_start = s[swap_v, swap_j]
+    mission_end = T[swap_v, swap_j]
+    vehicle = np.concatenate([trip_v, swap_v, swap_v, swap_v])
+    start = np.concatenate([T[trip_v, trip_j] - T_run, mission_end, swap_start, swap_start + T_swap])
+    stop = np.concatenate([T[trip_v, trip_j], swap_start, swap_start + T_swap, swap_start + T_swap + T_trip])
+    value = np.repeat([IN_TRIP, WAITING, SWAPPING, TRAVELING], [len(trip_v), len(swap_v), len(swap_v), len(swap_v)])
+    state = paint(vehicle, start, stop, value, (I, H), default=RUNNING)
+
+    # 电量：任务结束和换电结束两类事件，按时间排序后阶梯填充
+    event_v = np.concatenate([trip_v, swap_v])
+    event_t = np.concatenate([T[trip_v, trip_j], swap_start + T_swap])
+    event_e = np.concatenate([E[trip_v, trip_j], np.full(len(swap_v), p["C_swap"])])
+    order = np.argsort(event_t, kind="stable")
+    _, E_first = initial_state({**p, "I": I})
+    soc = step_fill(event_v[order], event_t[order], event_e[order], (I, H), E_first + p["Delta"])
+
+    planned_v, planned_j = np.nonzero(x > 0)
+    in_system = count_intervals(T[planned_v, planned_j] + 1, s[planned_v, planned_j] + T_swap, H)
+    return make_timeline(state, soc, in_system)
+
+
+def swap_intervals_from_trace(trace, simulation_time):
+    """
+    仿真记录中每次换电的车辆、决定换电（行程结束后前往换电站）的时间和开始换电的时间，
+    仿真结束时还没有开始的换电记为 simulation_time。每辆车的第 k 次决定换电对应第 k 次开始换电。
+    """
+    records = np.asarray(trace)
+    records = records[records["kind"] == STATE_CHANGE]
+    decide = records[records["new_state"] == TRAVELING]
+    start = records[(records["old_state"] == WAITING) & (records["new_state"] == SWAPPING)]
+    # 按车辆排序（同一车辆保持记录的先后），第 k 次开始换电落在该车决定换电的第 k 个位置
+    decide = decide[np.argsort(decide["vehicle"], kind="stable")]
+    start = start[np.argsort(start["vehicle"], kind="stable")]
+    vehicle = decide["vehicle"].astype(np.int64)
+    start_vehicle = start["vehicle"].astype(np.int64)
+    rank = np.arange(len(start)) - np.searchsorted(start_vehicle, start_vehicle, side="left")
+    swap_start = np.full(len(decide), simulation_time, dtype=np.int64)
+    swap_start[np.searchsorted(vehicle, start_vehicle, side="left") + rank] = start["time"]
+    return vehicle, decide["time"].astype(np.int64), swap_start
+
+
+def swap_intervals_from_results(results):
+    """MIP 结果中每次换电的车辆、决定换电的时间（任务结束 T[j]）和开始换电的时间 s[j]"""
+    T, s, x, z = (np.asarray(results[name]).astype(np.int64) for name in ("T", "s", "x", "z"))
+    vehicle, slot = np.nonzero((z > 0) & (x > 0))
+    return vehicle, T[vehicle, slot], s[vehicle, slot]
+
+
+def queue_at(time, vehicle, swap_vehicle, decide, swap_start, num_vehicles):
+    """
+    每个决策点 (time, vehicle) 时已决定换电、还没有开始换电（前往和排队换电）的其他车辆数，
+    即仿真中传给 needs_swap 的 BatterySwapStation.queue_length()。
+    同一分钟的事件与仿真一样按车辆编号先后处理：编号更小的车辆在同一分钟决定换电时计入，开始换电时不再计入。
+    """
+    def key(t, v):
+        return np.asarray(t, dtype=np.int64) * num_vehicles + np.asarray(v, dtype=np.int64)
+    point = key(time, vehicle)
+    # MIP 中可以在任务结束时立即换电，这样的区间为空，不计入
+    keep = np.asarray(swap_start) > np.asarray(decide)
+    decide, swap_start, swap_vehicle = (np.asarray(a)[keep] for a in (decide, swap_start, swap_vehicle))
+    # 决定换电早于决策点、开始换电晚于决策点的区间；开始换电不晚于决策点的区间一定也在前一项中
+    entered = np.searchsorted(np.sort(key(decide, swap_vehicle)), point, side="left")
+    started = np.searchsorted(np.sort(key(swap_start, swap_vehicle)), point, side="right")
+    return entered - started
+
+
+def timeline_from_trace(trace, num_vehicles, simulation_time, initial_soc=100, swap_time=CHARGINGTIME):
+    """
+    仿真记录（eventTrace 的结构化数组）的逐分钟状态、电量和排队车辆数，与 timeline_from_results 的格式相同。
+    每条状态记录开始一个状态，持续到同一车辆的下一条状态记录；电量取最近一条记录之后的电量。
+    in_system 与 MIP 结果的定义相同，从决定换电的下一分钟到换电结束（开始换电后 swap_time 分钟）计入。
+    """
+    records = np.asarray(trace)
+    records = records[records["kind"] == STATE_CHANGE]
+    # 同一车辆的记录按时间排在一起（记录本身按时间先后写入）
+    order = np.lexsort((np.arange(len(records)), records["time"], records["vehicle"]))
+    records = records[order]
+    vehicle = records["vehicle"].astype(np.int64)
+    start = records["time"].astype(np.int64)
+    stop = np.append(start[1:], simulation_time)
+    stop[np.append(vehicle[1:] != vehicle[:-1], True)] = simulation_time
+    shape = (num_vehicles, simulation_time)
+    state = paint(vehicle, start, stop, records["new_state"].astype(np.int64), shape, default=RUNNING)
+    soc = step_fill(vehicle, start, records["soc"], shape, np.full(num_vehicles, initial_soc))
+    _, decide, swap_start = swap_intervals_from_trace(trace, simulation_time)
+    in_system = count_intervals(decide + 1, swap_start + swap_time, simulation_time)
+    return make_timeline(state, soc, in_system)
+
+
+def compare_timelines(a, b):
+    """两条时间线逐分钟比较：各状态的车辆分钟数、平均排队和换电中的车辆数、平均电量（a、b 的时长需相同）"""
+    rows = {}
+    for name, timeline in (("a", a), ("b", b)):
+        rows[name] = {state: int((timeline["state"] == code).sum()) for state, code in STATE_CODES.items()}
+        rows[name]["mean_waiting"] = float(timeline["waiting"].mean())
+        rows[name]["mean_in_system"] = float(timeline["in_system"].mean())
+        rows[name]["mean_soc"] = float(timeline["soc"].mean())
+    rows["state_agreement"] = float((a["state"] == b["state"]).mean()) if a["state"].shape == b["state"].shape else None
+    return rows
@@ -0,0 +1,124 @@
+import heapq
+from collections import deque
+
+import numpy as np
+
+from smartCharging import MAX_QUEUE_LENGTH, Battery, Vehicle
+from modelParams import DEFAULT_PARAMS, initial_state
+
+
+def heuristic_schedule(high_battery_threshold, low_battery_threshold, alpha, dec, params=None,
+                       max_length=MAX_QUEUE_LENGTH, park=True):
+    """
+    按 smartCharging 中车辆的换电策略（Vehicle.needs_swap）在 MIP 的时间口径下排出可行的换电计划：
+    任务结束时按电量和排队长度决定是否换电，换电站单通道先到先换，换电后电池为 C_swap。
+    MIP 中换下的电池立即可用，所以策略里的 swap_ready 阈值在这里不起作用。
+    park: 未执行槽的电量会降到 0 以下时，是否在最后一个任务后补一次换电（预处理放开电量下界的模型不需要）
+    返回 T/s/x/E/z（形状 (I, J) 的整数数组）和目标值 objective。
+    """
+    p = {**DEFAULT_PARAMS, **(params or {})}
+    I, J, H, T_run, T_swap, T_trip = p["I"], p["J"], p["H"], p["T_run"], p["T_swap"], p["T_trip"]
+    C_swap, Delta, C_min = p["C_swap"], p["Delta"], p["C_min"]
+
+    T = np.zeros((I, J), dtype=np.int64)
+    s = np.zeros((I, J), dtype=np.int64)
+    x = np.zeros((I, J), dtype=np.int64)
+    E = np.zeros((I, J), dtype=np.int64)
+    z = np.zeros((I, J), dtype=np.int64)
+    last = np.zeros(I, dtype=np.int64)  # 每辆车最后执行的任务
+
+    vehicles = [Vehicle(i, Battery(), high_battery_threshold, low_battery_threshold, alpha, dec) for i in range(I)]
+    T[:, 0], E[:, 0] = initial_state(p)
+    z[:, 0] = 1
+    events = [(T[i, 0], i, 0) for i in range(I)]
+    heapq.heapify(events)
+    waiting = deque()  # 已排入换电站但尚未开始换电的开始时间，先到先换所以单调递增
+    bay_free = p["bay_free"]
+
+    while events:
+        t, i, j = heapq.heappop(events)
+        while waiting and waiting[0] <= t:
+            waiting.popleft()
+        if j + 1 == J or E[i, j] < C_min:
+            continue
+
+        vehicle = vehicles[i]
+        vehicle.battery.charge = E[i, j]
+        swap = vehicle.needs_swap(len(waiting), max_length) or E[i, j] - Delta < C_min
+        start = max(t, bay_free)
+        if swap and start + T_swap + T_trip + T_run > H:
+            swap = False  # 换电后下一趟已超出时窗，不如不换
+        if swap:
+            t_next, e_next = start + T_swap + T_trip + T_run, C_swap - Delta
+        else:
+            t_next, e_next = t + T_run, E[i, j] - Delta
+        if t_next > H or e_next < 0:
+            continue
+
+        if swap:
+            x[i, j], s[i, j] = 1, start
+            bay_free = start + T_swap
+            waiting.append(start)
+        T[i, j + 1], E[i, j + 1], z[i, j + 1] = t_next, e_next, 1
+        last[i] = j + 1
+        heapq.heappush(events, (t_next, i, j + 1))
+
+    fill_unexecuted(T, s, x, E, last, bay_free, p, park)
+    return {"T": T, "s": s, "x": x, "E": E, "z": z, "objective": T_run * int(z.sum())}
+
+
+def fill_unexecuted(T, s, x, E, last, bay_free, params, park=True):
+    """
+    补齐每辆车最后执行的任务 last 之后的槽：不换电，时间和电量按约束顺延；
+    park 为 True 且电量不够顺延到最后一个槽时，在最后一个任务后、bay_free 之后补一次换电。
+    """
+    p = {**DEFAULT_PARAMS, **params}
+    J, T_run, Delta = T.shape[1], p["T_run"], p["Delta"]
+    for i in range(len(T)):
+        j = last[i]
+        if park and j + 1 < J and E[i, j] < Delta * (J - 1 - j):
+            x[i, j], s[i, j] = 1, max(T[i, j], bay_free)
+            bay_free = s[i, j] + p["T_swap"]
+            T[i, j + 1], E[i, j + 1] = s[i, j] + p["T_swap"] + p["T_trip"] + T_run, p["C_swap"] - Delta
+            j += 1
+        for k in range(j + 1, J):
+            T[i, k], E[i, k] = T[i, k - 1] + T_run, E[i, k - 1] - Delta
+
+
+def set_start(variables, schedule):
+    """
+    把换电计划设为 build_model 返回的模型变量的 MIP 初始解（两种模型形式都适用）。
+    车辆初始状态相同时，先按执行任务数从多到少重新编号，以满足 compact 模型的对称性约束。
+    """
+    order = np.arange(len(schedule["z"]))
+    if np.all(schedule["T"][:, 0] == schedule["T"][0, 0]) and np.all(schedule["E"][:, 0] == schedule["E"][0, 0]):
+        order = np.argsort(-schedule["z"].sum(axis=1), kind="stable")
+    values = {name: schedule[name][order] for name in ("T", "s", "x", "E", "z")}
+    for name, value in values.items():
+        variables[name].Start = value
+
+    # 排序变量：两个槽都换电时按换电开始时间先后取值，其余为 0
+    first, second = variables["pairs"]
+    s_flat, x_flat = values["s"].reshape(-1), values["x"].reshape(-1)
+    both = (x_flat[first] == 1) & (x_flat[second] == 1)
+    before = both & (s_flat[first] < s_flat[second])
+    y = variables["y"]
+    if y.ndim == 2:
+        y.Start = np.stack([before, both & ~before]).astype(np.int64)
+    else:
+        y.Start = before.astype(np.int64)
+
+
+def warm_start(variables, policy, params=None, max_length=MAX_QUEUE_LENGTH):
+    """
+    用启发式策略给模型设置初始解，返回启发式的目标值作为基线。
+    policy: 与 simulate 相同的 (high, low, swap_ready, alpha, dec)
+    """
+    high, low, _, alpha, dec = policy
+    # 预处理可能改变了任务槽数
+    params = {**(params or {}), "J": variables["T"].shape[1]}
+    fixed = variables.get("fixed")
+    park = fixed is None or not fixed["relax_energy"]
+    schedule = heuristic_schedule(high, low, alpha, dec, params, max_length, park)
+    set_start(variables, schedule)
+    return schedule["objective"]